@@ -0,0 +1,43 @@
+"""add sys_user search indexes
+
+Revision ID: 20582f59752a
+Revises: 9c17ac4e0149
+Create Date: 2026-10-17 12:37:11.923412
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20582f59752a'
+down_revision = '9c17ac4e0149'
+branch_labels = None
+depends_on = None
+
+# 表由 create_table 创建时索引已随模型创建，此处仅为已有表补充缺失的索引
+INDEXES = [
+    ('ix_sys_user_join_time_id', ['join_time', 'id'], {}),
+    ('ix_sys_user_phone', ['phone'], {}),
+    ('ft_sys_user_username', ['username'], {'mysql_prefix': 'FULLTEXT', 'mysql_with_parser': 'ngram'}),
+    ('ft_sys_user_phone', ['phone'], {'mysql_prefix': 'FULLTEXT', 'mysql_with_parser': 'ngram'}),
+]
+
+
+def _existing_indexes():
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('sys_user')}
+
+
+def upgrade():
+    existing = _existing_indexes()
+    for name, columns, kwargs in INDEXES:
+        if name not in existing:
+            op.create_index(name, 'sys_user', columns, unique=False, **kwargs)
+
+
+def downgrade():
+    existing = _existing_indexes()
+    for name, _, _ in reversed(INDEXES):
+        if name in existing:
+            op.drop_index(name, table_name='sys_user')
@@ -3,6 +3,7 @@
 from fastapi import APIRouter
 
 from backend.app.admin.api.v1.auth import router as auth_router
+from backend.app.admin.api.v1.monitor import router as monitor_router
 from backend.app.admin.api.v1.user import router as user_router
 from backend.core.conf import settings
 
@@ -10,3 +11,4 @@ v1 = APIRouter(prefix=settings.FASTAPI_API_V1_PATH)
 
 v1.include_router(auth_router)
 v1.include_router(user_router, prefix='/users', tags=['用户'])
+v1.include_router(monitor_router, prefix='/monitor', tags=['监控'])
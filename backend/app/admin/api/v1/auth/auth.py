@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Body, Depends, Request
 from fastapi.security import OAuth2PasswordRequestForm
 
 from backend.app.admin.service.auth_service import auth_service
 from backend.common.security.jwt import DependsJwtAuth
 from backend.common.response.response_schema import response_base, ResponseModel, ResponseSchemaModel
-from backend.app.admin.schema.token import GetSwaggerToken, GetLoginToken
+from backend.app.admin.schema.token import GetSwaggerToken, GetLoginToken, GetNewToken, RefreshToken
 from backend.app.admin.schema.user import Auth2
 
 router = APIRouter()
@@ -19,11 +19,27 @@ async def swagger_login(form_data: OAuth2PasswordRequestForm = Depends()) -> Get
 
 
 @router.post('/login', summary='验证码登录')
-async def user_login(request: Request, obj: Auth2) -> ResponseSchemaModel[GetLoginToken]:
-    data = await auth_service.login(request=request, obj=obj)
+async def user_login(obj: Auth2) -> ResponseSchemaModel[GetLoginToken]:
+    data = await auth_service.login(obj=obj)
     return response_base.success(data=data)
 
 
-@router.post('/logout', summary='用户登出', dependencies=[DependsJwtAuth])
-async def user_logout() -> ResponseModel:
+@router.post(
+    '/token/refresh',
+    summary='刷新 token',
+    description='刷新 token 仅可使用一次，使用后将返回新的 token',
+)
+async def refresh_token(obj: RefreshToken) -> ResponseSchemaModel[GetNewToken]:
+    data = await auth_service.refresh_token(obj=obj)
+    return response_base.success(data=data)
+
+
+@router.post(
+    '/logout',
+    summary='用户登出',
+    description='吊销当前 token，可选同时吊销刷新 token',
+    dependencies=[DependsJwtAuth],
+)
+async def user_logout(request: Request, obj: RefreshToken | None = Body(None)) -> ResponseModel:
+    await auth_service.logout(request=request, obj=obj)
     return response_base.success()
@@ -1,15 +1,14 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from fast_captcha import img_captcha
-from fastapi import APIRouter, Depends, Request
+import base64
+
+from fastapi import APIRouter, Depends, Response
 from fastapi_limiter.depends import RateLimiter
-from starlette.concurrency import run_in_threadpool
 
 from backend.app.admin.schema.captcha import GetCaptchaDetail
+from backend.app.admin.service.captcha_service import captcha_service
 from backend.common.response.response_schema import ResponseSchemaModel, response_base
 from backend.core.conf import settings
-from backend.database.db import uuid4_str
-from backend.database.redis import redis_client
 
 router = APIRouter()
 
@@ -19,18 +18,27 @@ router = APIRouter()
     summary='获取登录验证码',
     dependencies=[Depends(RateLimiter(times=5, seconds=10))],
 )
-async def get_captcha(request: Request) -> ResponseSchemaModel[GetCaptchaDetail]:
+async def get_captcha() -> ResponseSchemaModel[GetCaptchaDetail]:
     """
-    此接口可能存在性能损耗，尽管是异步接口，但是验证码生成是IO密集型任务，使用线程池尽量减少性能损耗
+    验证码由后台任务预生成，预生成池为空时回退为同步生成
     """
-    img_type: str = 'base64'
-    img, code = await run_in_threadpool(img_captcha, img_byte=img_type)
-    uuid = uuid4_str()
-    request.app.state.captcha_uuid = uuid
-    await redis_client.set(
-        f'{settings.CAPTCHA_LOGIN_REDIS_PREFIX}:{uuid}',
-        code,
-        ex=settings.CAPTCHA_LOGIN_EXPIRE_SECONDS,
-    )
-    data = GetCaptchaDetail(image_type=img_type, image=img)
+    uuid, img = await captcha_service.generate()
+    data = GetCaptchaDetail(uuid=uuid, image_type='base64', image=base64.b64encode(img).decode())
     return response_base.success(data=data)
+
+
+@router.get(
+    '/image',
+    summary='获取登录验证码图片',
+    description=f'直接返回验证码图片二进制内容，验证码 uuid 通过响应头 {settings.CAPTCHA_UUID_HEADER} 返回',
+    response_class=Response,
+    responses={200: {'content': {captcha_service.media_type: {}}}},
+    dependencies=[Depends(RateLimiter(times=5, seconds=10))],
+)
+async def get_captcha_image() -> Response:
+    uuid, img = await captcha_service.generate()
+    return Response(
+        content=img,
+        media_type=captcha_service.media_type,
+        headers={settings.CAPTCHA_UUID_HEADER: uuid, 'Cache-Control': 'no-store'},
+    )
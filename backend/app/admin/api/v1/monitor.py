@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from fastapi import APIRouter
+
+from backend.app.admin.service.captcha_service import captcha_service
+from backend.app.admin.service.login_time_service import login_time_service
+from backend.common.response.response_schema import response_base, ResponseModel
+from backend.common.security.jwt import (
+    CurrentUser,
+    password_hash_pool,
+    superuser_verify,
+    token_cache_stats,
+    user_snapshot_stats,
+)
+from backend.common.security.revocation import token_revocation
+from backend.database.db import async_engine, replica_set
+from backend.database.pool import pool_stats
+
+router = APIRouter()
+
+
+@router.get('/stats', summary='获取运行统计信息', description='当前工作进程内部统计信息，仅超级用户可用')
+async def get_stats(current_user: CurrentUser) -> ResponseModel:
+    superuser_verify(current_user)
+    data = {
+        'user_snapshot': user_snapshot_stats(),
+        'token_cache': token_cache_stats(),
+        'password_hash_pool': password_hash_pool.stats(),
+        'token_revocation': token_revocation.stats(),
+        'login_time': login_time_service.stats(),
+        'captcha_pool': captcha_service.stats(),
+        'database_pool': {
+            'primary': pool_stats(async_engine),
+            **{
+                replica.name: {**pool_stats(replica.engine), 'healthy': replica.healthy}
+                for replica in replica_set.replicas
+            },
+        },
+    }
+    return response_base.success(data=data)
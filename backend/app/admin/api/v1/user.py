@@ -2,15 +2,26 @@
 # -*- coding: utf-8 -*-
 from typing import Annotated
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Response
+from fastapi.responses import StreamingResponse
 
 from backend.common.security.jwt import CurrentUser, DependsJwtAuth
-from backend.common.pagination import paging_data, DependsPagination, PageData
+from backend.app.admin.model import User
+from backend.common.enums import CountStrategy, ExportFormat
+from backend.common.pagination import (
+    CursorPageData,
+    DependsCursorPagination,
+    PageData,
+    cursor_paging_data,
+    pagination_depends,
+    paging_data,
+)
+from backend.common.schema import partial_schema
+from backend.core.conf import settings
 from backend.common.response.response_schema import response_base, ResponseModel, ResponseSchemaModel
-from backend.database.db import CurrentSession
+from backend.database.db import CurrentReadSession
 from backend.app.admin.schema.user import CreateUser, GetUserInfo, ResetPassword, UpdateUser, Avatar
 from backend.app.admin.service.user_service import UserService
-from backend.utils.serializers import select_as_dict
 
 router = APIRouter()
 
@@ -29,13 +40,83 @@ async def password_reset(obj: ResetPassword) -> ResponseModel:
     return response_base.fail()
 
 
-@router.get('/{username}', summary='查看用户信息', dependencies=[DependsJwtAuth])
-async def get_user(username: str) -> ResponseSchemaModel[GetUserInfo]:
-    current_user = await UserService.get_userinfo(username=username)
-    data = GetUserInfo(**select_as_dict(current_user))
+@router.get(
+    '/cursor',
+    summary='（模糊条件）游标分页获取所有用户',
+    dependencies=[
+        DependsJwtAuth,
+        DependsCursorPagination,
+    ],
+    response_model=ResponseSchemaModel[CursorPageData[GetUserInfo]],
+)
+async def get_all_users_by_cursor(
+    db: CurrentReadSession,
+    username: Annotated[str | None, Query(description='用户名关键词，模糊匹配，以 * 结尾时为前缀匹配')] = None,
+    phone: Annotated[str | None, Query(description='手机号关键词，模糊匹配，以 * 结尾时为前缀匹配')] = None,
+    status: Annotated[int | None, Query()] = None,
+    fields: Annotated[str | None, Query(description='返回字段，逗号分隔，默认全部')] = None,
+) -> Response:
+    selected = UserService.get_fields(fields)
+    # 游标分页需查询排序列
+    columns = tuple(dict.fromkeys((*selected, 'join_time', 'id')))
+    user_select = await UserService.get_select(username=username, phone=phone, status=status, fields=columns)
+    page_data = await cursor_paging_data(db, user_select, keys=(User.join_time, User.id))
+    schema = ResponseSchemaModel[CursorPageData[partial_schema(GetUserInfo, selected)]]
+    return response_base.struct_success(data=page_data, schema=schema)
+
+
+@router.get('/suggest', summary='用户名自动补全', dependencies=[DependsJwtAuth])
+async def suggest_users(
+    prefix: Annotated[str, Query(min_length=1, description='用户名前缀')],
+    limit: Annotated[int, Query(gt=0, le=settings.USER_SUGGEST_MAX_LIMIT)] = 10,
+) -> ResponseSchemaModel[list[str]]:
+    data = await UserService.suggest(prefix=prefix, limit=limit)
     return response_base.success(data=data)
 
 
+@router.post('/suggest/rebuild', summary='重建用户名自动补全索引')
+async def rebuild_user_suggest(current_user: CurrentUser) -> ResponseSchemaModel[int]:
+    count = await UserService.rebuild_suggest(current_user=current_user)
+    return response_base.success(data=count)
+
+
+@router.get(
+    '/export',
+    summary='（模糊条件）流式导出所有用户',
+    dependencies=[DependsJwtAuth],
+    response_class=StreamingResponse,
+)
+async def export_users(
+    username: Annotated[str | None, Query(description='用户名关键词，模糊匹配，以 * 结尾时为前缀匹配')] = None,
+    phone: Annotated[str | None, Query(description='手机号关键词，模糊匹配，以 * 结尾时为前缀匹配')] = None,
+    status: Annotated[int | None, Query()] = None,
+    fmt: Annotated[ExportFormat, Query(alias='format')] = ExportFormat.ndjson,
+) -> StreamingResponse:
+    content = await UserService.export(username=username, phone=phone, status=status, fmt=fmt)
+    media_type = 'text/csv; charset=utf-8' if fmt == ExportFormat.csv else 'application/x-ndjson'
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename=users.{fmt.value}'},
+    )
+
+
+@router.get(
+    '/{username}',
+    summary='查看用户信息',
+    dependencies=[DependsJwtAuth],
+    response_model=ResponseSchemaModel[GetUserInfo],
+)
+async def get_user(
+    username: str,
+    fields: Annotated[str | None, Query(description='返回字段，逗号分隔，默认全部')] = None,
+) -> Response:
+    selected = UserService.get_fields(fields)
+    current_user = await UserService.get_userinfo(username=username, fields=selected)
+    schema = ResponseSchemaModel[partial_schema(GetUserInfo, selected)]
+    return response_base.struct_success(data=current_user, schema=schema)
+
+
 @router.put('/{username}', summary='更新用户信息', dependencies=[DependsJwtAuth])
 async def update_userinfo(username: str, obj: UpdateUser) -> ResponseModel:
     count = await UserService.update(username=username, obj=obj)
@@ -57,18 +138,22 @@ async def update_avatar(username: str, avatar: Avatar) -> ResponseModel:
     summary='（模糊条件）分页获取所有用户',
     dependencies=[
         DependsJwtAuth,
-        DependsPagination,
+        pagination_depends(count=CountStrategy.estimated),
     ],
+    response_model=ResponseSchemaModel[PageData[GetUserInfo]],
 )
 async def get_all_users(
-    db: CurrentSession,
-    username: Annotated[str | None, Query()] = None,
-    phone: Annotated[str | None, Query()] = None,
+    db: CurrentReadSession,
+    username: Annotated[str | None, Query(description='用户名关键词，模糊匹配，以 * 结尾时为前缀匹配')] = None,
+    phone: Annotated[str | None, Query(description='手机号关键词，模糊匹配，以 * 结尾时为前缀匹配')] = None,
     status: Annotated[int | None, Query()] = None,
-) -> ResponseSchemaModel[PageData[GetUserInfo]]:
-    user_select = await UserService.get_select(username=username, phone=phone, status=status)
+    fields: Annotated[str | None, Query(description='返回字段，逗号分隔，默认全部')] = None,
+) -> Response:
+    selected = UserService.get_fields(fields)
+    user_select = await UserService.get_select(username=username, phone=phone, status=status, fields=selected)
     page_data = await paging_data(db, user_select)
-    return response_base.success(data=page_data)
+    schema = ResponseSchemaModel[PageData[partial_schema(GetUserInfo, selected)]]
+    return response_base.struct_success(data=page_data, schema=schema)
 
 
 @router.delete(
@@ -1,16 +1,61 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 from datetime import datetime
+from typing import Sequence
 
 import bcrypt
-from sqlalchemy import select, update, desc, and_
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql import Select
+from sqlalchemy import Boolean, Row, select, update, desc, and_, case
+from sqlalchemy.ext.asyncio import AsyncScalarResult, AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql import ColumnElement, Select
+from sqlalchemy.sql.functions import FunctionElement
 from sqlalchemy_crud_plus import CRUDPlus
 
 from backend.app.admin.model import User
 from backend.app.admin.schema.user import CreateUser, UpdateUser, Avatar
-from backend.common.security.jwt import get_hash_password
+from backend.common.security.jwt import async_get_hash_password
+from backend.core.conf import settings
+
+
+def _ngram_searchable(keyword: str) -> bool:
+    """
+    判断关键词能否由 ngram 全文索引完整检索，ngram 分词忽略空白并丢弃包含停用词的词元
+
+    :param keyword:
+    :return:
+    """
+    token_size = settings.USER_SEARCH_NGRAM_TOKEN_SIZE
+    if len(keyword) < token_size or '"' in keyword or any(char.isspace() for char in keyword):
+        return False
+    keyword = keyword.lower()
+    return not any(len(word) <= token_size and word in keyword for word in settings.USER_SEARCH_NGRAM_STOPWORDS)
+
+
+class ngram_match(FunctionElement[bool]):
+    """
+    ngram 全文检索条件，仅 MySQL 编译为 MATCH ... AGAINST 短语检索，其余数据库编译为等价的 LIKE 模糊匹配
+
+    语句构造时无法得知执行的数据库，由编译时的方言决定检索方式
+    """
+
+    type = Boolean()
+    inherit_cache = True
+
+    def __init__(self, column: InstrumentedAttribute, keyword: str):
+        super().__init__(column.match(f'"{keyword}"'), column.contains(keyword, autoescape=True))
+
+
+@compiles(ngram_match)
+def _compile_ngram_match(element: ngram_match, compiler, **kw) -> str:
+    _, like = element.clauses
+    return compiler.process(like, **kw)
+
+
+@compiles(ngram_match, 'mysql')
+def _compile_ngram_match_mysql(element: ngram_match, compiler, **kw) -> str:
+    match, _ = element.clauses
+    return compiler.process(match, **kw)
 
 
 class CRUDUser(CRUDPlus[User]):
@@ -34,12 +79,40 @@ class CRUDUser(CRUDPlus[User]):
         """
         return await self.select_model_by_column(db, username=username)
 
+    async def get_columns_by_username(self, db: AsyncSession, username: str, columns: Sequence[str]) -> Row | None:
+        """
+        通过 username 获取用户指定列
+
+        :param db:
+        :param username:
+        :param columns: 列名
+        :return:
+        """
+        stmt = select(*[getattr(self.model, column) for column in columns]).where(self.model.username == username)
+        return (await db.execute(stmt)).first()
+
     async def update_login_time(self, db: AsyncSession, username: str, login_time: datetime) -> int:
         user = await db.execute(
             update(self.model).where(self.model.username == username).values(last_login_time=login_time)
         )
         return user.rowcount
 
+    async def update_login_times(self, db: AsyncSession, login_times: dict[int, datetime]) -> int:
+        """
+        批量更新用户登录时间
+
+        :param db:
+        :param login_times: 用户 id 与登录时间映射
+        :return:
+        """
+        user = await db.execute(
+            update(self.model)
+            .where(self.model.id.in_(login_times.keys()))
+            .values(last_login_time=case(login_times, value=self.model.id))
+            .execution_options(synchronize_session=False)
+        )
+        return user.rowcount
+
     async def create(self, db: AsyncSession, obj: CreateUser) -> None:
         """
         创建用户
@@ -49,7 +122,7 @@ class CRUDUser(CRUDPlus[User]):
         :return:
         """
         salt = bcrypt.gensalt()
-        obj.password = get_hash_password(obj.password, salt)
+        obj.password = await async_get_hash_password(obj.password, salt)
         dict_obj = obj.model_dump()
         dict_obj.update({'salt': salt})
         new_user = self.model(**dict_obj)
@@ -108,21 +181,67 @@ class CRUDUser(CRUDPlus[User]):
         """
         return await self.update_model(db, pk, {'password': new_pwd})
 
-    async def get_list(self, username: str = None, phone: str = None, status: int = None) -> Select:
+    async def stream_usernames(self, db: AsyncSession) -> AsyncScalarResult[str]:
+        """
+        通过服务端游标分批获取所有用户名
+
+        :param db:
+        :return:
+        """
+        stmt = select(self.model.username).execution_options(yield_per=settings.USER_SUGGEST_REBUILD_BATCH_SIZE)
+        return await db.stream_scalars(stmt)
+
+    async def warmup(self, db: AsyncSession) -> None:
+        """
+        执行常用查询，预热 SQL 编译缓存
+
+        :param db:
+        :return:
+        """
+        await self.get(db, 0)
+        await self.get_by_username(db, '')
+        await self.check_email(db, '')
+        stmt = await self.get_list()
+        await db.execute(stmt.limit(1).offset(0))
+
+    @staticmethod
+    def search_clause(column: InstrumentedAttribute, keyword: str) -> ColumnElement[bool]:
+        """
+        根据关键词形态选择检索方式，除前缀匹配外结果均与 LIKE 模糊匹配一致：
+
+        - 以 * 结尾时前缀匹配，走 B-tree 索引
+        - 可被 ngram 完整分词时使用 FULLTEXT ngram 索引短语检索，仅限 MySQL
+        - 其余情况（短于 ngram 分词长度，包含空白、双引号或停用词）回退为 LIKE 模糊匹配
+
+        :param column:
+        :param keyword:
+        :return:
+        """
+        if keyword.endswith('*'):
+            return column.startswith(keyword.rstrip('*'), autoescape=True)
+        if _ngram_searchable(keyword):
+            return ngram_match(column, keyword)
+        return column.contains(keyword, autoescape=True)
+
+    async def get_list(
+        self, username: str = None, phone: str = None, status: int = None, columns: Sequence[str] | None = None
+    ) -> Select:
         """
         获取用户列表
 
-        :param username:
-        :param phone:
+        :param username: 用户名关键词，以 * 结尾时为前缀匹配
+        :param phone: 手机号关键词，以 * 结尾时为前缀匹配
         :param status:
+        :param columns: 查询列名，默认查询用户实体
         :return:
         """
-        stmt = select(self.model).order_by(desc(self.model.join_time))
+        entities = [getattr(self.model, column) for column in columns] if columns else [self.model]
+        stmt = select(*entities).order_by(desc(self.model.join_time), desc(self.model.id))
         where_list = []
         if username:
-            where_list.append(self.model.username.like(f'%{username}%'))
+            where_list.append(self.search_clause(self.model.username, username))
         if phone:
-            where_list.append(self.model.phone.like(f'%{phone}%'))
+            where_list.append(self.search_clause(self.model.phone, phone))
         if status is not None:
             where_list.append(self.model.status == status)
         if where_list:
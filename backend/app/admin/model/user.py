@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 from datetime import datetime
 
-from sqlalchemy import String, VARBINARY
+from sqlalchemy import Index, String, VARBINARY
 from sqlalchemy.orm import Mapped, mapped_column
 
 from backend.common.model import DataClassBase, id_key
@@ -14,6 +14,11 @@ class User(DataClassBase):
     """用户表"""
 
     __tablename__ = 'sys_user'
+    __table_args__ = (
+        Index('ix_sys_user_join_time_id', 'join_time', 'id'),
+        Index('ft_sys_user_username', 'username', mysql_prefix='FULLTEXT', mysql_with_parser='ngram'),
+        Index('ft_sys_user_phone', 'phone', mysql_prefix='FULLTEXT', mysql_with_parser='ngram'),
+    )
 
     id: Mapped[id_key] = mapped_column(init=False)
     uuid: Mapped[str] = mapped_column(String(50), init=False, default_factory=uuid4_str, unique=True)
@@ -24,6 +29,6 @@ class User(DataClassBase):
     status: Mapped[int] = mapped_column(default=1, comment='用户账号状态(0停用 1正常)')
     is_superuser: Mapped[bool] = mapped_column(default=False, comment='超级权限(0否 1是)')
     avatar: Mapped[str | None] = mapped_column(String(255), default=None, comment='头像')
-    phone: Mapped[str | None] = mapped_column(String(11), default=None, comment='手机号')
+    phone: Mapped[str | None] = mapped_column(String(11), default=None, index=True, comment='手机号')
     join_time: Mapped[datetime] = mapped_column(init=False, default_factory=timezone.now, comment='注册时间')
     last_login_time: Mapped[datetime | None] = mapped_column(init=False, onupdate=timezone.now, comment='上次登录')
@@ -13,3 +13,14 @@ class GetSwaggerToken(SchemaBase):
 
 class GetLoginToken(GetSwaggerToken):
     access_token_type: str = 'Bearer'
+    refresh_token: str
+
+
+class RefreshToken(SchemaBase):
+    refresh_token: str
+
+
+class GetNewToken(SchemaBase):
+    access_token: str
+    access_token_type: str = 'Bearer'
+    refresh_token: str
@@ -13,6 +13,7 @@ class Auth(SchemaBase):
 
 
 class Auth2(Auth):
+    uuid: str = Field(description='验证码 uuid')
     captcha: str
 
 
@@ -42,6 +43,17 @@ class GetUserInfo(UpdateUser):
     last_login_time: datetime.datetime | None = None
 
 
+class CurrentUserIns(SchemaBase):
+    """当前用户快照，用于鉴权缓存"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    username: str
+    status: int
+    is_superuser: bool
+
+
 class ResetPassword(SchemaBase):
     username: str
     old_password: str
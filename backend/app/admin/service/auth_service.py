@@ -5,53 +5,84 @@ from fastapi.security import OAuth2PasswordRequestForm
 
 from backend.app.admin.crud.crud_user import user_dao
 from backend.app.admin.model import User
-from backend.app.admin.schema.token import GetLoginToken
+from backend.app.admin.schema.token import GetLoginToken, GetNewToken, RefreshToken
 from backend.app.admin.schema.user import Auth2
+from backend.app.admin.service.captcha_service import captcha_service
+from backend.app.admin.service.login_time_service import login_time_service
 from backend.common.exception import errors
 from backend.common.response.response_code import CustomErrorCode
-from backend.common.security.jwt import password_verify, create_access_token
-from backend.core.conf import settings
-from backend.database.db import async_db_session
-from backend.database.redis import redis_client
+from backend.common.security.jwt import (
+    async_password_verify,
+    create_access_token,
+    create_refresh_token,
+    get_token,
+    get_user_snapshot,
+    jwt_decode,
+)
+from backend.common.security.revocation import token_revocation
+from backend.database.db import current_session
 from backend.utils.timezone import timezone
 
 
 class AuthService:
     @staticmethod
     async def user_verify(username: str, password: str) -> User:
-        async with async_db_session() as db:
-            user = await user_dao.get_by_username(db, username)
-            if not user:
-                raise errors.NotFoundError(msg='用户名或密码有误')
-            elif not password_verify(password, user.password):
-                raise errors.AuthorizationError(msg='用户名或密码有误')
-            elif not user.status:
-                raise errors.AuthorizationError(msg='用户已被锁定, 请联系统管理员')
-            return user
+        db = current_session()
+        user = await user_dao.get_by_username(db, username)
+        if not user:
+            raise errors.NotFoundError(msg='用户名或密码有误')
+        elif not await async_password_verify(password, user.password):
+            raise errors.AuthorizationError(msg='用户名或密码有误')
+        elif not user.status:
+            raise errors.AuthorizationError(msg='用户已被锁定, 请联系统管理员')
+        return user
 
     async def swagger_login(self, *, form_data: OAuth2PasswordRequestForm) -> tuple[str, User]:
-        async with async_db_session() as db:
-            user = await self.user_verify(form_data.username, form_data.password)
-            await user_dao.update_login_time(db, user.username, login_time=timezone.now())
-            token = create_access_token(str(user.id))
-            return token, user
-
-    async def login(self, *, request: Request, obj: Auth2) -> GetLoginToken:
-        async with async_db_session() as db:
-            user = await self.user_verify(obj.username, obj.password)
+        user = await self.user_verify(form_data.username, form_data.password)
+        login_time_service.record(user.id, timezone.now())
+        token = create_access_token(str(user.id))
+        return token, user
+
+    async def login(self, *, obj: Auth2) -> GetLoginToken:
+        redis_code = await captcha_service.consume(obj.uuid)
+        if not redis_code:
+            raise errors.ForbiddenError(msg='验证码失效，请重新获取')
+        if redis_code.lower() != obj.captcha.lower():
+            raise errors.CustomError(error=CustomErrorCode.CAPTCHA_ERROR)
+        user = await self.user_verify(obj.username, obj.password)
+        login_time_service.record(user.id, timezone.now())
+        token = create_access_token(str(user.id))
+        refresh_token = create_refresh_token(str(user.id))
+        data = GetLoginToken(access_token=token, refresh_token=refresh_token, user=user)
+        return data
+
+    @staticmethod
+    async def refresh_token(*, obj: RefreshToken) -> GetNewToken:
+        token_payload = jwt_decode(obj.refresh_token, token_type='refresh')
+        user = await get_user_snapshot(token_payload.id)
+        if not user:
+            raise errors.TokenError(msg='Refresh Token 无效')
+        if not user.status:
+            raise errors.AuthorizationError(msg='用户已被锁定, 请联系统管理员')
+        # 刷新 token 只能使用一次，吊销成功者才能获取新 token
+        if not await token_revocation.revoke(token_payload.jti, token_payload.expire_time):
+            raise errors.TokenError(msg='Refresh Token 已失效')
+        data = GetNewToken(
+            access_token=create_access_token(str(user.id)),
+            refresh_token=create_refresh_token(str(user.id)),
+        )
+        return data
+
+    @staticmethod
+    async def logout(*, request: Request, obj: RefreshToken | None = None) -> None:
+        token_payload = jwt_decode(get_token(request))
+        await token_revocation.revoke(token_payload.jti, token_payload.expire_time)
+        if obj:
             try:
-                captcha_uuid = request.app.state.captcha_uuid
-                redis_code = await redis_client.get(f'{settings.CAPTCHA_LOGIN_REDIS_PREFIX}:{captcha_uuid}')
-                if not redis_code:
-                    raise errors.ForbiddenError(msg='验证码失效，请重新获取')
-            except AttributeError:
-                raise errors.ForbiddenError(msg='验证码失效，请重新获取')
-            if redis_code.lower() != obj.captcha.lower():
-                raise errors.CustomError(error=CustomErrorCode.CAPTCHA_ERROR)
-            await user_dao.update_login_time(db, user.username, login_time=timezone.now())
-            token = create_access_token(str(user.id))
-            data = GetLoginToken(access_token=token, user=user)
-            return data
+                refresh_payload = jwt_decode(obj.refresh_token, token_type='refresh')
+            except errors.TokenError:
+                return
+            await token_revocation.revoke(refresh_payload.jti, refresh_payload.expire_time)
 
 
 auth_service: AuthService = AuthService()
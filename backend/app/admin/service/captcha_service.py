@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+from collections import deque
+from io import BytesIO
+
+from fast_captcha import img_captcha
+from starlette.concurrency import run_in_threadpool
+
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.database.db import uuid4_str
+from backend.database.redis import redis_client
+
+
+def render_captcha() -> tuple[bytes, str]:
+    """
+    生成验证码图片，图片格式由配置决定
+
+    :return:
+    """
+    if settings.CAPTCHA_IMAGE_FORMAT == 'webp':
+        # 按配置的质量重新编码，fast_captcha 不支持指定 webp 质量
+        img, code = img_captcha(img_byte='file', img_type='webp')
+        buf = BytesIO()
+        img.save(buf, 'WEBP', quality=settings.CAPTCHA_IMAGE_WEBP_QUALITY)
+        return buf.getvalue(), code
+    img, code = img_captcha(img_byte='bytesio', img_type=settings.CAPTCHA_IMAGE_FORMAT)
+    return img.getvalue(), code
+
+
+class CaptchaService:
+    """
+    验证码预生成池
+
+    后台任务在池内数量低于低水位时，将池补充至高水位；池为空时回退为同步生成
+    """
+
+    media_type: str = f'image/{settings.CAPTCHA_IMAGE_FORMAT}'
+
+    def __init__(self):
+        self._pool: deque[tuple[bytes, str]] = deque(maxlen=settings.CAPTCHA_POOL_HIGH_WATERMARK)
+        self._refill_event = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.pool_hits = 0
+        self.fallbacks = 0
+        self.refills = 0
+        self.generated = 0
+
+    @staticmethod
+    async def _render() -> tuple[bytes, str]:
+        """
+        验证码生成是 CPU 密集型任务，使用线程池尽量减少对事件循环的影响
+
+        :return:
+        """
+        return await run_in_threadpool(render_captcha)
+
+    async def get(self) -> tuple[bytes, str]:
+        """
+        获取一个验证码图片及其验证码
+
+        :return:
+        """
+        try:
+            captcha = self._pool.popleft()
+        except IndexError:
+            self.fallbacks += 1
+            captcha = await self._render()
+        else:
+            self.pool_hits += 1
+        if len(self._pool) < settings.CAPTCHA_POOL_LOW_WATERMARK:
+            self._refill_event.set()
+        return captcha
+
+    async def generate(self) -> tuple[str, bytes]:
+        """
+        生成登录验证码，并将验证码存入 redis
+
+        :return: 验证码 uuid 及图片内容
+        """
+        img, code = await self.get()
+        uuid = uuid4_str()
+        await redis_client.set(
+            f'{settings.CAPTCHA_LOGIN_REDIS_PREFIX}:{uuid}',
+            code,
+            ex=settings.CAPTCHA_LOGIN_EXPIRE_SECONDS,
+        )
+        return uuid, img
+
+    @staticmethod
+    async def consume(uuid: str) -> str | None:
+        """
+        获取并删除验证码，原子操作，验证码只能使用一次
+
+        :param uuid:
+        :return:
+        """
+        return await redis_client.getdel(f'{settings.CAPTCHA_LOGIN_REDIS_PREFIX}:{uuid}')
+
+    async def _run(self) -> None:
+        while True:
+            await self._refill_event.wait()
+            self._refill_event.clear()
+            self.refills += 1
+            try:
+                while len(self._pool) < settings.CAPTCHA_POOL_HIGH_WATERMARK:
+                    self._pool.append(await self._render())
+                    self.generated += 1
+            except Exception as e:
+                log.error('❌ 验证码预生成失败: {}', e)
+                await asyncio.sleep(1)
+
+    def start(self) -> None:
+        """
+        启动验证码预生成任务
+
+        :return:
+        """
+        if settings.CAPTCHA_POOL_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self._run())
+            self._refill_event.set()
+
+    async def stop(self) -> None:
+        """
+        停止验证码预生成任务
+
+        :return:
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._pool.clear()
+
+    def stats(self) -> dict:
+        """
+        统计信息
+
+        :return:
+        """
+        return {
+            'size': len(self._pool),
+            'low_watermark': settings.CAPTCHA_POOL_LOW_WATERMARK,
+            'high_watermark': settings.CAPTCHA_POOL_HIGH_WATERMARK,
+            'pool_hits': self.pool_hits,
+            'fallbacks': self.fallbacks,
+            'refills': self.refills,
+            'generated': self.generated,
+        }
+
+
+captcha_service: CaptchaService = CaptchaService()
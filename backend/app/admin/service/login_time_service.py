@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+
+from contextlib import suppress
+from datetime import datetime
+
+from backend.app.admin.crud.crud_user import user_dao
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.database.db import async_db_session
+
+
+class LoginTimeService:
+    """
+    用户最后登录时间延迟写入
+
+    登录时间先缓存在当前工作进程内存中，由后台任务按批量更新写入数据库，缓存数据的最大延迟由配置决定
+    """
+
+    def __init__(self):
+        self._buffer: dict[int, datetime] = {}
+        self._first_buffered_at: float | None = None
+        self._task: asyncio.Task | None = None
+        self._batch_ready = asyncio.Event()
+        self.flushed = 0
+        self.flush_errors = 0
+
+    def record(self, user_id: int, login_time: datetime) -> None:
+        """
+        记录用户登录时间
+
+        :param user_id:
+        :param login_time:
+        :return:
+        """
+        if self._first_buffered_at is None:
+            self._first_buffered_at = time.monotonic()
+        self._buffer[user_id] = login_time
+        if len(self._buffer) >= settings.USER_LOGIN_TIME_FLUSH_BATCH_SIZE:
+            self._batch_ready.set()
+
+    def _should_flush(self) -> bool:
+        if not self._buffer:
+            return False
+        if len(self._buffer) >= settings.USER_LOGIN_TIME_FLUSH_BATCH_SIZE:
+            return True
+        return time.monotonic() - self._first_buffered_at >= settings.USER_LOGIN_TIME_FLUSH_MAX_LAG_SECONDS
+
+    async def flush(self) -> None:
+        """
+        将缓存的登录时间批量写入数据库
+
+        :return:
+        """
+        if not self._buffer:
+            return
+        login_times, self._buffer, self._first_buffered_at = self._buffer, {}, None
+        items = list(login_times.items())
+        batch_size = settings.USER_LOGIN_TIME_FLUSH_BATCH_SIZE
+        for i in range(0, len(items), batch_size):
+            batch = dict(items[i : i + batch_size])
+            try:
+                async with async_db_session.begin() as db:
+                    await user_dao.update_login_times(db, batch)
+            except Exception as e:
+                self.flush_errors += 1
+                log.error('❌ 用户登录时间批量写入失败: {}', e)
+                # 写回缓存等待下次写入，期间产生的更新登录时间优先
+                for user_id, login_time in batch.items():
+                    self._buffer.setdefault(user_id, login_time)
+                if self._first_buffered_at is None:
+                    self._first_buffered_at = time.monotonic()
+            else:
+                self.flushed += len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            # 缓存达到批量大小时立即唤醒，否则按检查间隔唤醒
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._batch_ready.wait(), settings.USER_LOGIN_TIME_FLUSH_INTERVAL_SECONDS)
+            self._batch_ready.clear()
+            if self._should_flush():
+                await self.flush()
+
+    def start(self) -> None:
+        """
+        启动后台写入任务
+
+        :return:
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        停止后台写入任务，并写入剩余数据
+
+        :return:
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        """
+        统计信息
+
+        :return:
+        """
+        return {
+            'pending': len(self._buffer),
+            'flushed': self.flushed,
+            'flush_errors': self.flush_errors,
+        }
+
+
+login_time_service: LoginTimeService = LoginTimeService()
@@ -1,88 +1,186 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from sqlalchemy import Select
+import asyncio
+import csv
+import io
 
+from typing import Any, AsyncGenerator, Sequence
+
+from sqlalchemy import Row, Select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.common.enums import ExportFormat
 from backend.common.exception import errors
-from backend.common.security.jwt import superuser_verify, password_verify, get_hash_password
+from backend.common.security.jwt import (
+    superuser_verify,
+    async_password_verify,
+    async_get_hash_password,
+    invalidate_user_snapshot,
+)
 from backend.app.admin.crud.crud_user import user_dao
-from backend.database.db import async_db_session
-from backend.app.admin.model import User
-from backend.app.admin.schema.user import CreateUser, ResetPassword, UpdateUser, Avatar
+from backend.app.admin.service.user_suggest_service import user_suggest_service
+from backend.core.conf import settings
+from backend.database.db import current_read_session, current_session, current_unit_of_work, get_read_sessionmaker
+from backend.app.admin.schema.user import CreateUser, CurrentUserIns, GetUserInfo, ResetPassword, UpdateUser, Avatar
+from backend.utils.msgspec_struct import struct_encode_lines, struct_to_builtins
+
+
+def _encode_csv(rows: Sequence[Sequence[Any]]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def _encode_export(rows: Sequence[Row], fmt: ExportFormat) -> bytes:
+    """
+    按 GetUserInfo 的序列化规则编码导出数据，与用户信息接口输出一致
+
+    :param rows:
+    :param fmt:
+    :return:
+    """
+    if fmt == ExportFormat.csv:
+        return _encode_csv([list(row.values()) for row in struct_to_builtins(GetUserInfo, rows)])
+    return struct_encode_lines(GetUserInfo, rows)
+
+
+async def _stream_export(
+    session_maker: async_sessionmaker[AsyncSession], stmt: Select, columns: list[str], fmt: ExportFormat
+) -> AsyncGenerator[bytes, None]:
+    async with session_maker() as db:
+        result = await db.stream(stmt.execution_options(yield_per=settings.USER_EXPORT_YIELD_PER))
+        try:
+            if fmt == ExportFormat.csv:
+                # 带 BOM 以便 Excel 正确识别编码
+                yield '\ufeff'.encode() + _encode_csv([columns])
+            async for partition in result.partitions():
+                yield _encode_export(partition, fmt)
+        except (asyncio.CancelledError, GeneratorExit):
+            # 客户端断开时直接废弃连接，避免关闭服务端游标时读完剩余结果
+            await db.invalidate()
+            raise
 
 
 class UserService:
     @staticmethod
     async def register(*, obj: CreateUser) -> None:
-        async with async_db_session.begin() as db:
-            if not obj.password:
-                raise errors.ForbiddenError(msg='密码为空')
-            username = await user_dao.get_by_username(db, obj.username)
-            if username:
-                raise errors.ForbiddenError(msg='用户已注册')
-            email = await user_dao.check_email(db, obj.email)
-            if email:
-                raise errors.ForbiddenError(msg='邮箱已注册')
-            await user_dao.create(db, obj)
+        db = current_session()
+        if not obj.password:
+            raise errors.ForbiddenError(msg='密码为空')
+        username = await user_dao.get_by_username(db, obj.username)
+        if username:
+            raise errors.ForbiddenError(msg='用户已注册')
+        email = await user_dao.check_email(db, obj.email)
+        if email:
+            raise errors.ForbiddenError(msg='邮箱已注册')
+        await user_dao.create(db, obj)
+        current_unit_of_work().after_commit(user_suggest_service.add, obj.username)
 
     @staticmethod
     async def pwd_reset(*, obj: ResetPassword) -> int:
-        async with async_db_session.begin() as db:
-            user = await user_dao.get_by_username(db, obj.username)
-            if not password_verify(obj.old_password, user.password):
-                raise errors.ForbiddenError(msg='原密码错误')
-            np1 = obj.new_password
-            np2 = obj.confirm_password
-            if np1 != np2:
-                raise errors.ForbiddenError(msg='密码输入不一致')
-            new_pwd = get_hash_password(obj.new_password, user.salt)
-            count = await user_dao.reset_password(db, user.id, new_pwd)
-            return count
+        db = current_session()
+        user = await user_dao.get_by_username(db, obj.username)
+        if not await async_password_verify(obj.old_password, user.password):
+            raise errors.ForbiddenError(msg='原密码错误')
+        np1 = obj.new_password
+        np2 = obj.confirm_password
+        if np1 != np2:
+            raise errors.ForbiddenError(msg='密码输入不一致')
+        new_pwd = await async_get_hash_password(obj.new_password, user.salt)
+        count = await user_dao.reset_password(db, user.id, new_pwd)
+        current_unit_of_work().after_commit(invalidate_user_snapshot, user.id)
+        return count
 
     @staticmethod
-    async def get_userinfo(*, username: str) -> User:
-        async with async_db_session() as db:
-            user = await user_dao.get_by_username(db, username)
-            if not user:
-                raise errors.NotFoundError(msg='用户不存在')
-            return user
+    def get_fields(fields: str | None = None) -> tuple[str, ...]:
+        """
+        解析稀疏字段参数，按 GetUserInfo 字段顺序返回，未指定时返回全部字段
+
+        :param fields: 逗号分隔的字段名
+        :return:
+        """
+        all_fields = tuple(GetUserInfo.model_fields)
+        if not fields:
+            return all_fields
+        selected = {field.strip() for field in fields.split(',') if field.strip()}
+        if not selected:
+            raise errors.RequestError(msg='返回字段不能为空')
+        invalid = selected.difference(all_fields)
+        if invalid:
+            raise errors.RequestError(msg=f'不支持的字段: {", ".join(sorted(invalid))}')
+        return tuple(field for field in all_fields if field in selected)
+
+    @staticmethod
+    async def get_userinfo(*, username: str, fields: Sequence[str]) -> Row:
+        db = await current_read_session()
+        user = await user_dao.get_columns_by_username(db, username, fields)
+        if not user:
+            raise errors.NotFoundError(msg='用户不存在')
+        return user
 
     @staticmethod
     async def update(*, username: str, obj: UpdateUser) -> int:
-        async with async_db_session.begin() as db:
-            input_user = await user_dao.get_by_username(db, username=username)
-            if not input_user:
-                raise errors.NotFoundError(msg='用户不存在')
-            superuser_verify(input_user)
-            if input_user.username != obj.username:
-                _username = await user_dao.get_by_username(db, obj.username)
-                if _username:
-                    raise errors.ForbiddenError(msg='用户名已注册')
-            if input_user.email != obj.email:
-                email = await user_dao.check_email(db, obj.email)
-                if email:
-                    raise errors.ForbiddenError(msg='邮箱已注册')
-            count = await user_dao.update_userinfo(db, input_user.id, obj)
-            return count
+        db = current_session()
+        input_user = await user_dao.get_by_username(db, username=username)
+        if not input_user:
+            raise errors.NotFoundError(msg='用户不存在')
+        superuser_verify(input_user)
+        if input_user.username != obj.username:
+            _username = await user_dao.get_by_username(db, obj.username)
+            if _username:
+                raise errors.ForbiddenError(msg='用户名已注册')
+        if input_user.email != obj.email:
+            email = await user_dao.check_email(db, obj.email)
+            if email:
+                raise errors.ForbiddenError(msg='邮箱已注册')
+        count = await user_dao.update_userinfo(db, input_user.id, obj)
+        current_unit_of_work().after_commit(invalidate_user_snapshot, input_user.id)
+        if input_user.username != obj.username:
+            current_unit_of_work().after_commit(user_suggest_service.rename, input_user.username, obj.username)
+        return count
 
     @staticmethod
     async def update_avatar(*, username: str, avatar: Avatar) -> int:
-        async with async_db_session.begin() as db:
-            input_user = await user_dao.get_by_username(db, username)
-            if not input_user:
-                raise errors.NotFoundError(msg='用户不存在')
-            count = await user_dao.update_avatar(db, input_user.id, avatar)
-            return count
+        db = current_session()
+        input_user = await user_dao.get_by_username(db, username)
+        if not input_user:
+            raise errors.NotFoundError(msg='用户不存在')
+        count = await user_dao.update_avatar(db, input_user.id, avatar)
+        current_unit_of_work().after_commit(invalidate_user_snapshot, input_user.id)
+        return count
+
+    @staticmethod
+    async def get_select(
+        *, username: str = None, phone: str = None, status: int = None, fields: Sequence[str] | None = None
+    ) -> Select:
+        return await user_dao.get_list(username=username, phone=phone, status=status, columns=fields)
+
+    @staticmethod
+    async def suggest(*, prefix: str, limit: int) -> list[str]:
+        return await user_suggest_service.suggest(prefix, limit)
+
+    @staticmethod
+    async def rebuild_suggest(*, current_user: CurrentUserIns) -> int:
+        superuser_verify(current_user)
+        return await user_suggest_service.rebuild()
 
     @staticmethod
-    async def get_select(*, username: str = None, phone: str = None, status: int = None) -> Select:
-        return await user_dao.get_list(username=username, phone=phone, status=status)
+    async def export(
+        *, username: str = None, phone: str = None, status: int = None, fmt: ExportFormat
+    ) -> AsyncGenerator[bytes, None]:
+        columns = list(GetUserInfo.model_fields.keys())
+        stmt = await user_dao.get_list(username=username, phone=phone, status=status, columns=columns)
+        session_maker = await get_read_sessionmaker()
+        return _stream_export(session_maker, stmt, columns, fmt)
 
     @staticmethod
-    async def delete(*, current_user: User, username: str) -> int:
-        async with async_db_session.begin() as db:
-            superuser_verify(current_user)
-            input_user = await user_dao.get_by_username(db, username)
-            if not input_user:
-                raise errors.NotFoundError(msg='用户不存在')
-            count = await user_dao.delete(db, input_user.id)
-            return count
+    async def delete(*, current_user: CurrentUserIns, username: str) -> int:
+        db = current_session()
+        superuser_verify(current_user)
+        input_user = await user_dao.get_by_username(db, username)
+        if not input_user:
+            raise errors.NotFoundError(msg='用户不存在')
+        count = await user_dao.delete(db, input_user.id)
+        current_unit_of_work().after_commit(invalidate_user_snapshot, input_user.id)
+        current_unit_of_work().after_commit(user_suggest_service.remove, input_user.username)
+        return count
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import uuid
+
+from backend.app.admin.crud.crud_user import user_dao
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.database.db import async_db_session
+from backend.database.redis import redis_client
+
+# 成员格式：小写用户名 + 分隔符 + 原始用户名，按小写字典序检索，返回原始用户名
+_SEPARATOR = '\x00'
+# 大于任意合法 UTF-8 字符，用作前缀检索上界
+_MAX_CHAR = '\U0010ffff'
+
+# 更新索引，并将变更追加到进行中的重建任务的变更日志
+# KEYS: 索引, 重建变更日志集合; ARGV: 变更日志过期时间, (操作, 成员)...
+_UPDATE_SCRIPT = """
+local journals = redis.call('SMEMBERS', KEYS[2])
+for i = 2, #ARGV, 2 do
+    local op, member = ARGV[i], ARGV[i + 1]
+    if op == 'add' then
+        redis.call('ZADD', KEYS[1], 0, member)
+    else
+        redis.call('ZREM', KEYS[1], member)
+    end
+    for _, journal in ipairs(journals) do
+        redis.call('RPUSH', journal, op, member)
+        redis.call('EXPIRE', journal, ARGV[1])
+    end
+end
+"""
+
+# 将重建期间的变更应用到临时 key 后原子替换索引，返回索引条数
+# KEYS: 临时 key, 变更日志, 索引, 重建变更日志集合
+_FINISH_REBUILD_SCRIPT = """
+local changes = redis.call('LRANGE', KEYS[2], 0, -1)
+for i = 1, #changes, 2 do
+    if changes[i] == 'add' then
+        redis.call('ZADD', KEYS[1], 0, changes[i + 1])
+    else
+        redis.call('ZREM', KEYS[1], changes[i + 1])
+    end
+end
+redis.call('SREM', KEYS[4], KEYS[2])
+redis.call('DEL', KEYS[2])
+local count = redis.call('ZCARD', KEYS[1])
+if count > 0 then
+    redis.call('RENAME', KEYS[1], KEYS[3])
+else
+    redis.call('DEL', KEYS[3])
+end
+return count
+"""
+
+
+class UserSuggestService:
+    """
+    用户名自动补全
+
+    用户名以相同分值写入 Redis 有序集合，通过 ZRANGEBYLEX 完成前缀检索，不访问数据库
+    """
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+        self._journals_key = f'{settings.USER_SUGGEST_REDIS_KEY}:rebuilding'
+        self._update_script = redis_client.register_script(_UPDATE_SCRIPT)
+        self._finish_rebuild_script = redis_client.register_script(_FINISH_REBUILD_SCRIPT)
+
+    @staticmethod
+    def _member(username: str) -> str:
+        return f'{username.lower()}{_SEPARATOR}{username}'
+
+    async def _update(self, *changes: tuple[str, str]) -> None:
+        args = [settings.USER_SUGGEST_REBUILD_LOCK_SECONDS]
+        for op, username in changes:
+            args.extend((op, self._member(username)))
+        await self._update_script(keys=[settings.USER_SUGGEST_REDIS_KEY, self._journals_key], args=args)
+
+    async def add(self, username: str) -> None:
+        """
+        添加用户名
+
+        :param username:
+        :return:
+        """
+        await self._update(('add', username))
+
+    async def remove(self, username: str) -> None:
+        """
+        移除用户名
+
+        :param username:
+        :return:
+        """
+        await self._update(('remove', username))
+
+    async def rename(self, old_username: str, new_username: str) -> None:
+        """
+        更新用户名
+
+        :param old_username:
+        :param new_username:
+        :return:
+        """
+        await self._update(('remove', old_username), ('add', new_username))
+
+    async def suggest(self, prefix: str, limit: int) -> list[str]:
+        """
+        前缀检索用户名
+
+        :param prefix:
+        :param limit:
+        :return:
+        """
+        prefix = prefix.lower().replace(_SEPARATOR, '')
+        members = await redis_client.zrangebylex(
+            settings.USER_SUGGEST_REDIS_KEY, f'[{prefix}', f'[{prefix}{_MAX_CHAR}', start=0, num=limit
+        )
+        return [member.split(_SEPARATOR, 1)[1] for member in members]
+
+    async def rebuild(self) -> int:
+        """
+        从数据库重建索引，先写入临时 key 再原子替换，重建期间检索不受影响
+
+        重建期间的增删改记录到变更日志，替换前应用到临时 key，避免数据库快照之后的变更丢失
+
+        :return:
+        """
+        tmp_key = f'{settings.USER_SUGGEST_REDIS_KEY}:rebuild:{uuid.uuid4().hex}'
+        journal_key = f'{tmp_key}:changes'
+        # 须在读取数据库之前登记变更日志
+        await self._watch_changes(journal_key)
+        try:
+            async with async_db_session() as db:
+                result = await user_dao.stream_usernames(db)
+                async for partition in result.partitions():
+                    await redis_client.zadd(tmp_key, {self._member(username): 0 for username in partition})
+                    await self._watch_changes(journal_key)
+            count = await self._finish_rebuild_script(
+                keys=[tmp_key, journal_key, settings.USER_SUGGEST_REDIS_KEY, self._journals_key]
+            )
+        finally:
+            async with redis_client.pipeline() as pipe:
+                pipe.srem(self._journals_key, journal_key)
+                pipe.delete(tmp_key, journal_key)
+                await pipe.execute()
+        log.info('用户名自动补全索引重建完成，共 {} 条', count)
+        return count
+
+    async def _watch_changes(self, journal_key: str) -> None:
+        async with redis_client.pipeline() as pipe:
+            pipe.sadd(self._journals_key, journal_key)
+            pipe.expire(self._journals_key, settings.USER_SUGGEST_REBUILD_LOCK_SECONDS)
+            pipe.expire(journal_key, settings.USER_SUGGEST_REBUILD_LOCK_SECONDS)
+            await pipe.execute()
+
+    async def ensure(self) -> None:
+        """
+        索引不存在时重建，多个工作进程同时启动时仅由一个进程执行
+
+        :return:
+        """
+        if await redis_client.exists(settings.USER_SUGGEST_REDIS_KEY):
+            return
+        lock_key = f'{settings.USER_SUGGEST_REDIS_KEY}:lock'
+        if not await redis_client.set(lock_key, 1, nx=True, ex=settings.USER_SUGGEST_REBUILD_LOCK_SECONDS):
+            return
+        try:
+            await self.rebuild()
+        except Exception as e:
+            log.error('❌ 用户名自动补全索引重建失败: {}', e)
+        finally:
+            await redis_client.delete(lock_key)
+
+    def start(self) -> None:
+        """
+        启动后台任务，冷启动时重建索引
+
+        :return:
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self.ensure())
+
+    async def stop(self) -> None:
+        """
+        停止后台任务
+
+        :return:
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+user_suggest_service: UserSuggestService = UserSuggestService()
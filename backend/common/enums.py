@@ -24,3 +24,19 @@ class StrEnum(_EnumBase, str, Enum):
     """字符串枚举"""
 
     pass
+
+
+class CountStrategy(StrEnum):
+    """分页总数统计方式"""
+
+    exact = 'exact'
+    cached = 'cached'
+    estimated = 'estimated'
+    none = 'none'
+
+
+class ExportFormat(StrEnum):
+    """数据导出格式"""
+
+    ndjson = 'ndjson'
+    csv = 'csv'
@@ -73,6 +73,13 @@ class GatewayError(BaseExceptionMixin):
         super().__init__(msg=msg, data=data, background=background)
 
 
+class ServiceUnavailableError(BaseExceptionMixin):
+    code = StandardResponseCode.HTTP_503
+
+    def __init__(self, *, msg: str = 'Service Unavailable', data: Any = None, background: BackgroundTask | None = None):
+        super().__init__(msg=msg, data=data, background=background)
+
+
 class AuthorizationError(BaseExceptionMixin):
     code = StandardResponseCode.HTTP_401
 
@@ -2,19 +2,32 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import base64
+import hashlib
+import json
+
+from contextvars import ContextVar
+from datetime import datetime
 from math import ceil
-from typing import TYPE_CHECKING, Generic, Sequence, TypeVar
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Generic, Sequence, TypeVar
 
 from fastapi import Depends, Query
 from fastapi_pagination import pagination_ctx
-from fastapi_pagination.bases import AbstractPage, AbstractParams, RawParams
-from fastapi_pagination.ext.sqlalchemy import paginate
+from fastapi_pagination.api import request, resolve_params
+from fastapi_pagination.bases import AbstractPage, AbstractParams, CursorRawParams, RawParams
 from fastapi_pagination.links.bases import create_links
 from pydantic import BaseModel, Field
+from sqlalchemy import func, inspect, select as sa_select, text, tuple_
+
+from backend.common.enums import CountStrategy
+from backend.common.exception import errors
+from backend.core.conf import settings
+from backend.database.redis import redis_client
 
 if TYPE_CHECKING:
     from sqlalchemy import Select
     from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import InstrumentedAttribute
 
 T = TypeVar('T')
 SchemaT = TypeVar('SchemaT')
@@ -31,20 +44,33 @@ class _CustomPageParams(BaseModel, AbstractParams):
         )
 
 
+class _CursorPageParams(BaseModel, AbstractParams):
+    cursor: str | None = Query(None, description='Page cursor')
+    size: int = Query(20, gt=0, le=100, description='Page size')  # 默认 20 条记录
+
+    def to_raw_params(self) -> CursorRawParams:
+        return CursorRawParams(
+            cursor=self.cursor,
+            size=self.size,
+        )
+
+
 class _Links(BaseModel):
     first: str = Field(..., description='首页链接')
-    last: str = Field(..., description='尾页链接')
+    last: str | None = Field(None, description='尾页链接')
     self: str = Field(..., description='当前页链接')
     next: str | None = Field(None, description='下一页链接')
     prev: str | None = Field(None, description='上一页链接')
+    next_cursor: str | None = Field(None, description='下一页游标')
+    prev_cursor: str | None = Field(None, description='上一页游标')
 
 
 class _PageDetails(BaseModel):
     items: list = Field([], description='当前页数据')
-    total: int = Field(..., description='总条数')
+    total: int | None = Field(None, description='总条数，未统计时为空')
     page: int = Field(..., description='当前页')
     size: int = Field(..., description='每页数量')
-    total_pages: int = Field(..., description='总页数')
+    total_pages: int | None = Field(None, description='总页数，未统计时为空')
     links: _Links
 
 
@@ -55,16 +81,24 @@ class _CustomPage(_PageDetails, AbstractPage[T], Generic[T]):
     def create(
         cls,
         items: list,
-        total: int,
+        total: int | None,
         params: _CustomPageParams,
+        *,
+        has_next: bool | None = None,
     ) -> _CustomPage[T]:
         page = params.page
         size = params.size
-        total_pages = ceil(total / params.size)
+        if total is None:
+            total_pages = None
+            last = None
+        else:
+            total_pages = ceil(total / params.size)
+            last = {'page': f'{total_pages}', 'size': size} if total > 0 else {'page': 1, 'size': size}
+            has_next = (page + 1) <= total_pages
         links = create_links(
             first={'page': 1, 'size': size},
-            last={'page': f'{ceil(total / params.size)}', 'size': size} if total > 0 else {'page': 1, 'size': size},
-            next={'page': f'{page + 1}', 'size': size} if (page + 1) <= total_pages else None,
+            last=last,
+            next={'page': f'{page + 1}', 'size': size} if has_next else None,
             prev={'page': f'{page - 1}', 'size': size} if (page - 1) >= 1 else None,
         ).model_dump()
 
@@ -78,6 +112,41 @@ class _CustomPage(_PageDetails, AbstractPage[T], Generic[T]):
         )
 
 
+class _CursorPageDetails(BaseModel):
+    items: list = Field([], description='当前页数据')
+    size: int = Field(..., description='每页数量')
+    links: _Links
+
+
+class _CursorPage(_CursorPageDetails, AbstractPage[T], Generic[T]):
+    __params_type__ = _CursorPageParams
+
+    @classmethod
+    def create(
+        cls,
+        items: list,
+        params: _CursorPageParams,
+        *,
+        next_cursor: str | None = None,
+        prev_cursor: str | None = None,
+    ) -> _CursorPage[T]:
+        url = request().url.remove_query_params('cursor')
+
+        def _link(cursor: str | None) -> str:
+            target = url.include_query_params(cursor=cursor) if cursor else url
+            return f'{target.path}?{target.query}' if target.query else target.path
+
+        links = _Links(
+            first=_link(None),
+            self=_link(params.cursor),
+            next=_link(next_cursor) if next_cursor else None,
+            prev=_link(prev_cursor) if prev_cursor else None,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
+        )
+        return cls(items=items, size=params.size, links=links)
+
+
 class PageData(_PageDetails, Generic[SchemaT]):
     """
     包含 data schema 的统一返回模型，适用于分页接口
@@ -103,18 +172,219 @@ class PageData(_PageDetails, Generic[SchemaT]):
     items: Sequence[SchemaT]
 
 
-async def paging_data(db: AsyncSession, select: Select) -> dict:
+_count_strategy_ctx: ContextVar[CountStrategy] = ContextVar('count_strategy', default=CountStrategy.exact)
+
+
+async def _exact_count(db: AsyncSession, select: Select) -> int:
+    count_stmt = sa_select(func.count()).select_from(select.order_by(None).subquery())
+    return await db.scalar(count_stmt)
+
+
+async def _cached_count(db: AsyncSession, select: Select) -> int:
+    compiled = select.order_by(None).compile(db.get_bind())
+    fingerprint = json.dumps([compiled.string, compiled.params], sort_keys=True, default=str)
+    key = f'{settings.PAGINATION_COUNT_REDIS_PREFIX}:{hashlib.sha256(fingerprint.encode()).hexdigest()}'
+    cached = await redis_client.get(key)
+    if cached is not None:
+        return int(cached)
+    total = await _exact_count(db, select)
+    await redis_client.setex(key, settings.PAGINATION_COUNT_EXPIRE_SECONDS, total)
+    return total
+
+
+async def _estimated_count(db: AsyncSession, select: Select) -> int | None:
+    froms = select.get_final_froms()
+    if select.whereclause is not None or len(froms) != 1 or not hasattr(froms[0], 'name'):
+        return None
+    return await db.scalar(
+        text(
+            'SELECT TABLE_ROWS FROM information_schema.TABLES '
+            'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name'
+        ),
+        {'table_name': froms[0].name},
+    )
+
+
+def _deferred_join(select: Select, limit: int, offset: int) -> Select | None:
+    """
+    将深分页查询改写为延迟关联：先通过索引分页获取主键，再关联回表获取整行数据
+
+    :param select:
+    :param limit:
+    :param offset:
+    :return:
+    """
+    entities = {description['entity'] for description in select.column_descriptions}
+    if len(entities) != 1 or None in entities or not select._order_by_clauses:
+        return None
+    entity = entities.pop()
+    primary_key = inspect(entity).primary_key
+    if len(primary_key) != 1:
+        return None
+    pk = primary_key[0]
+    ids = select.with_only_columns(pk, maintain_column_froms=True).limit(limit).offset(offset).subquery()
+    exprs = [description['expr'] for description in select.column_descriptions]
+    return sa_select(*exprs).join(ids, pk == ids.c[pk.key]).order_by(*select._order_by_clauses)
+
+
+def _is_entity_select(select: Select) -> bool:
+    descriptions = select.column_descriptions
+    return len(descriptions) == 1 and descriptions[0]['expr'] is descriptions[0]['entity']
+
+
+async def _fetch_items(db: AsyncSession, select: Select, limit: int, offset: int) -> list:
+    stmt = None
+    if 0 < settings.PAGINATION_DEFERRED_JOIN_OFFSET <= offset:
+        stmt = _deferred_join(select, limit, offset)
+    if stmt is None:
+        stmt = select.limit(limit).offset(offset)
+    result = await db.execute(stmt)
+    if _is_entity_select(select):
+        return list(result.scalars().all())
+    return list(result.all())
+
+
+async def paging_data(db: AsyncSession, select: Select, count: CountStrategy | None = None) -> dict:
     """
     基于 SQLAlchemy 创建分页数据
 
+    总数统计方式默认取自分页依赖注入，可选：
+    exact 精确统计；cached 按查询条件缓存统计结果；
+    estimated 无过滤条件时使用 information_schema 估算，否则回退为 cached，非 MySQL 数据库回退为 exact；
+    none 不统计总数，多查询一条数据判断是否存在下一页
+
+    OFFSET 达到 PAGINATION_DEFERRED_JOIN_OFFSET 时，数据查询将自动改写为延迟关联
+
+    :param db:
+    :param select:
+    :param count: 总数统计方式
+    :return:
+    """
+    count = count or _count_strategy_ctx.get()
+    if count == CountStrategy.estimated and db.get_bind().dialect.name != 'mysql':
+        # information_schema 估算仅支持 MySQL
+        count = CountStrategy.exact
+    params: _CustomPageParams = resolve_params()
+    raw_params = params.to_raw_params()
+    if count == CountStrategy.none:
+        items = await _fetch_items(db, select, raw_params.limit + 1, raw_params.offset)
+        has_next = len(items) > raw_params.limit
+        page = _CustomPage.create(items[: raw_params.limit], None, params, has_next=has_next)
+        return page.model_dump()
+
+    if count == CountStrategy.exact:
+        items = await _fetch_items(db, select, raw_params.limit, raw_params.offset)
+        page = _CustomPage.create(items, await _exact_count(db, select), params)
+        return page.model_dump()
+
+    # 估算或缓存的总数可能偏小，多查询一条数据判断是否存在下一页，避免后续页无法访问
+    items = await _fetch_items(db, select, raw_params.limit + 1, raw_params.offset)
+    has_next = len(items) > raw_params.limit
+    items = items[: raw_params.limit]
+    total = None
+    if count == CountStrategy.estimated:
+        total = await _estimated_count(db, select)
+    if total is None:
+        total = await _cached_count(db, select)
+    if has_next:
+        total = max(total, raw_params.offset + len(items) + 1)
+    elif items:
+        # 末页可直接得出精确总数
+        total = raw_params.offset + len(items)
+    else:
+        total = min(total, raw_params.offset)
+    page = _CustomPage.create(items, total, params)
+    return page.model_dump()
+
+
+class CursorPageData(_CursorPageDetails, Generic[SchemaT]):
+    """
+    包含 data schema 的统一返回模型，适用于游标分页接口，用法参考 PageData
+    """
+
+    items: Sequence[SchemaT]
+
+
+def _encode_cursor(direction: str, values: Sequence[Any]) -> str:
+    raw = json.dumps([direction, *[v.isoformat() if isinstance(v, datetime) else v for v in values]])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor: str, keys: Sequence[InstrumentedAttribute]) -> tuple[str, list]:
+    try:
+        direction, *values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if direction not in ('n', 'p') or len(values) != len(keys):
+            raise ValueError
+        return direction, [
+            datetime.fromisoformat(v) if key.type.python_type is datetime else v for key, v in zip(keys, values)
+        ]
+    except (ValueError, TypeError):
+        raise errors.RequestError(msg='分页游标非法')
+
+
+async def cursor_paging_data(db: AsyncSession, select: Select, keys: Sequence[InstrumentedAttribute]) -> dict:
+    """
+    基于 SQLAlchemy 创建游标（keyset）分页数据，按 keys 倒序排列，keys 需包含唯一列以保证顺序稳定，
+    select 为列查询时需包含 keys 对应的列
+
     :param db:
     :param select:
+    :param keys: 排序列，例如 (User.join_time, User.id)
     :return:
     """
-    paginated_data: _CustomPage = await paginate(db, select)
-    page_data = paginated_data.model_dump()
-    return page_data
+    params: _CursorPageParams = resolve_params()
+    stmt = select.order_by(None).limit(params.size + 1)
+    direction = 'n'
+    if params.cursor:
+        direction, values = _decode_cursor(params.cursor, keys)
+        if direction == 'n':
+            stmt = stmt.where(tuple_(*keys) < tuple_(*values))
+        else:
+            stmt = stmt.where(tuple_(*keys) > tuple_(*values))
+    if direction == 'n':
+        stmt = stmt.order_by(*[key.desc() for key in keys])
+    else:
+        stmt = stmt.order_by(*[key.asc() for key in keys])
+    result = await db.execute(stmt)
+    rows = list(result.scalars().all() if _is_entity_select(select) else result.all())
+    has_more = len(rows) > params.size
+    rows = rows[: params.size]
+    if direction == 'p':
+        rows.reverse()
+    next_cursor = prev_cursor = None
+    if rows:
+        first = [getattr(rows[0], key.key) for key in keys]
+        last = [getattr(rows[-1], key.key) for key in keys]
+        if direction == 'n':
+            next_cursor = _encode_cursor('n', last) if has_more else None
+            prev_cursor = _encode_cursor('p', first) if params.cursor else None
+        else:
+            next_cursor = _encode_cursor('n', last)
+            prev_cursor = _encode_cursor('p', first) if has_more else None
+    page = _CursorPage.create(rows, params, next_cursor=next_cursor, prev_cursor=prev_cursor)
+    return page.model_dump()
+
+
+def pagination_depends(count: CountStrategy = CountStrategy.exact) -> Any:
+    """
+    分页依赖注入，并指定 paging_data 的总数统计方式
+
+    :param count: 总数统计方式
+    :return:
+    """
+
+    async def dependency(_: Any = Depends(pagination_ctx(_CustomPage))) -> AsyncGenerator[None, None]:
+        token = _count_strategy_ctx.set(count)
+        try:
+            yield
+        finally:
+            _count_strategy_ctx.reset(token)
+
+    return Depends(dependency)
 
 
 # 分页依赖注入
-DependsPagination = Depends(pagination_ctx(_CustomPage))
+DependsPagination = pagination_depends()
+
+# 游标分页依赖注入
+DependsCursorPagination = Depends(pagination_ctx(_CursorPage))
@@ -6,6 +6,7 @@ from fastapi import Response
 from pydantic import BaseModel
 
 from backend.common.response.response_code import CustomResponse, CustomResponseCode
+from backend.utils.msgspec_struct import struct_encode
 from backend.utils.serializers import MsgSpecJSONResponse
 
 SchemaT = TypeVar('SchemaT')
@@ -54,11 +55,13 @@ class ResponseBase:
         """
         请求返回通用方法
 
+        返回模型不在此处校验，由 FastAPI 按接口返回类型统一校验一次，data 可直接传入 ORM 对象
+
         :param res: 返回信息
         :param data: 返回数据
         :return:
         """
-        return ResponseModel(code=res.code, msg=res.msg, data=data)
+        return ResponseModel.model_construct(code=res.code, msg=res.msg, data=data)
 
     def success(
         self,
@@ -95,5 +98,27 @@ class ResponseBase:
         """
         return MsgSpecJSONResponse({'code': res.code, 'msg': res.msg, 'data': data})
 
+    @staticmethod
+    def struct_success(
+        *,
+        res: CustomResponseCode | CustomResponse = CustomResponseCode.HTTP_200,
+        data: Any | None = None,
+        schema: type[BaseModel],
+    ) -> Response:
+        """
+        使用由 schema 生成的 msgspec Struct 校验并序列化返回数据，输出与 pydantic 一致，适用于数据量较大的列表接口
+
+        .. tip::
+
+            可通过接口参数 response_model 指定 schema 以保留接口文档，不能使用箭头返回类型
+
+        :param res:
+        :param data:
+        :param schema: 完整返回模型，例如 ResponseSchemaModel[PageData[GetUserInfo]]
+        :return:
+        """
+        content = struct_encode(schema, {'code': res.code, 'msg': res.msg, 'data': data})
+        return Response(content, media_type='application/json')
+
 
 response_base: ResponseBase = ResponseBase()
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 from datetime import datetime
+from functools import lru_cache
 
-from pydantic import BaseModel, ConfigDict, EmailStr, validate_email
+from pydantic import BaseModel, ConfigDict, EmailStr, create_model, validate_email
 from pydantic_extra_types.phone_numbers import PhoneNumber
 
 from backend.core.conf import settings
@@ -157,3 +158,21 @@ class SchemaBase(BaseModel):
         use_enum_values=True,
         json_encoders={datetime: lambda x: x.strftime(settings.DATETIME_FORMAT)},
     )
+
+
+@lru_cache(maxsize=256)
+def partial_schema(schema: type[BaseModel], fields: tuple[str, ...]) -> type[BaseModel]:
+    """
+    根据 schema 创建仅包含指定字段的模型，字段定义及模型配置保持不变，适用于稀疏字段返回
+
+    :param schema:
+    :param fields:
+    :return:
+    """
+    if fields == tuple(schema.model_fields):
+        return schema
+    return create_model(
+        f'{schema.__name__}Partial',
+        __config__=schema.model_config,
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields},
+    )
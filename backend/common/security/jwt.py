@@ -1,5 +1,12 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import hashlib
+import time
+
+from collections import Counter
+from datetime import timedelta
+from uuid import uuid4
+
 from fastapi import Depends, Request
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.security.utils import get_authorization_scheme_param
@@ -8,15 +15,41 @@ from pwdlib import PasswordHash
 from pwdlib.hashers.bcrypt import BcryptHasher
 from typing_extensions import Annotated
 
+from backend.common.dataclasses import TokenPayload
 from backend.common.exception.errors import TokenError, AuthorizationError
+from backend.common.security.revocation import token_revocation
+from backend.common.security.user_snapshot import user_snapshot_cache
 from backend.core.conf import settings
-from backend.database.db import CurrentSession
+from backend.database.db import async_db_session
+from backend.database.redis import redis_client
 from backend.app.admin.model.user import User
+from backend.app.admin.schema.user import CurrentUserIns
+from backend.utils.cache import LRUCache
+from backend.utils.process_pool import BoundedProcessPool
+from backend.utils.timezone import timezone
 
 oauth2_schema = OAuth2PasswordBearer(tokenUrl=settings.TOKEN_URL_SWAGGER)
 
 password_hash = PasswordHash((BcryptHasher(),))
 
+# 密码哈希进程池
+password_hash_pool = BoundedProcessPool(
+    max_workers=settings.PASSWORD_HASH_POOL_SIZE,
+    max_queue=settings.PASSWORD_HASH_POOL_MAX_QUEUE,
+    timeout=settings.PASSWORD_HASH_POOL_TIMEOUT,
+)
+
+# 已验证 token 进程内缓存，键为 token 摘要
+token_cache: LRUCache[bytes, TokenPayload] = LRUCache(
+    maxsize=settings.TOKEN_CACHE_MAXSIZE, ttl=settings.TOKEN_CACHE_EXPIRE_SECONDS
+)
+# 无效 token 进程内缓存，键为 token 摘要，值为错误信息
+token_invalid_cache: LRUCache[bytes, str] = LRUCache(
+    maxsize=settings.TOKEN_INVALID_CACHE_MAXSIZE, ttl=settings.TOKEN_INVALID_CACHE_EXPIRE_SECONDS
+)
+# 当前用户快照 redis 命中及数据库加载计数
+user_snapshot_counter: Counter = Counter()
+
 
 def get_hash_password(password: str, salt: bytes | None) -> str:
     """
@@ -40,6 +73,34 @@ def password_verify(plain_password: str, hashed_password: str) -> bool:
     return password_hash.verify(plain_password, hashed_password)
 
 
+async def async_get_hash_password(password: str, salt: bytes | None) -> str:
+    """
+    在密码哈希进程池中加密密码，避免阻塞事件循环
+
+    :param password:
+    :param salt:
+    :return:
+    """
+    return await password_hash_pool.run(get_hash_password, password, salt)
+
+
+async def async_password_verify(plain_password: str, hashed_password: str) -> bool:
+    """
+    在密码哈希进程池中验证密码，避免阻塞事件循环
+
+    :param plain_password: The password to verify
+    :param hashed_password: The hash ciphers to compare
+    :return:
+    """
+    return await password_hash_pool.run(password_verify, plain_password, hashed_password)
+
+
+def _create_token(sub: str, token_type: str, expire_seconds: int) -> str:
+    expire = timezone.now() + timedelta(seconds=expire_seconds)
+    to_encode = {'sub': sub, 'exp': expire, 'jti': uuid4().hex, 'type': token_type}
+    return jwt.encode(to_encode, settings.TOKEN_SECRET_KEY, settings.TOKEN_ALGORITHM)
+
+
 def create_access_token(sub: str) -> str:
     """
     Generate encryption token
@@ -47,9 +108,17 @@ def create_access_token(sub: str) -> str:
     :param sub: The subject/userid of the JWT
     :return:
     """
-    to_encode = {'sub': sub}
-    access_token = jwt.encode(to_encode, settings.TOKEN_SECRET_KEY, settings.TOKEN_ALGORITHM)
-    return access_token
+    return _create_token(sub, 'access', settings.TOKEN_EXPIRE_SECONDS)
+
+
+def create_refresh_token(sub: str) -> str:
+    """
+    Generate refresh token
+
+    :param sub: The subject/userid of the JWT
+    :return:
+    """
+    return _create_token(sub, 'refresh', settings.TOKEN_REFRESH_EXPIRE_SECONDS)
 
 
 def get_token(request: Request) -> str:
@@ -65,37 +134,131 @@ def get_token(request: Request) -> str:
     return token
 
 
-def jwt_decode(token: str) -> int:
+def jwt_decode(token: str, token_type: str = 'access') -> TokenPayload:
     """
     Decode token
 
+    验证结果按 token 摘要缓存在进程内，有效 token 的缓存不会晚于 token 自身的过期时间
+
     :param token:
+    :param token_type: 期望的 token 类型，access 或 refresh
     :return:
     """
-    try:
-        payload = jwt.decode(token, settings.TOKEN_SECRET_KEY, algorithms=[settings.TOKEN_ALGORITHM])
-        user_id = int(payload.get('sub'))
-        if not user_id:
-            raise TokenError(msg='Token 无效')
-    except ExpiredSignatureError:
-        raise TokenError(msg='Token 已过期')
-    except (JWTError, Exception):
+    digest = hashlib.sha256(token.encode()).digest()
+    token_payload = token_cache.get(digest)
+    if token_payload is None:
+        invalid_msg = token_invalid_cache.get(digest)
+        if invalid_msg is not None:
+            raise TokenError(msg=invalid_msg)
+        try:
+            payload = jwt.decode(token, settings.TOKEN_SECRET_KEY, algorithms=[settings.TOKEN_ALGORITHM])
+            user_id = int(payload.get('sub'))
+            if not user_id:
+                raise TokenError(msg='Token 无效')
+            token_payload = TokenPayload(
+                id=user_id,
+                jti=payload['jti'],
+                expire_time=int(payload['exp']),
+                token_type=payload.get('type', 'access'),
+            )
+        except ExpiredSignatureError:
+            invalid_msg = 'Token 已过期'
+        except (JWTError, Exception):
+            invalid_msg = 'Token 无效'
+        if token_payload is None:
+            token_invalid_cache.set(digest, invalid_msg)
+            raise TokenError(msg=invalid_msg)
+        ttl = min(settings.TOKEN_CACHE_EXPIRE_SECONDS, token_payload.expire_time - time.time())
+        token_cache.set(digest, token_payload, ttl=ttl)
+    if token_payload.token_type != token_type:
         raise TokenError(msg='Token 无效')
-    return user_id
+    return token_payload
+
+
+def token_cache_stats() -> dict:
+    """
+    token 验证缓存统计信息
 
+    :return:
+    """
+    return {
+        'valid': token_cache.stats(),
+        'invalid': token_invalid_cache.stats(),
+    }
 
-async def get_current_user(db: CurrentSession, token: str = Depends(oauth2_schema)) -> User:
+
+async def get_user_snapshot(user_id: int) -> CurrentUserIns | None:
+    """
+    获取用户快照，依次查找进程内缓存、redis 缓存，均未命中时查询主库
+
+    快照会写入共享缓存，不能从存在复制延迟的只读副本加载，否则会在失效后重新缓存旧数据
+
+    :param user_id:
+    :return:
+    """
+    user = user_snapshot_cache.get(user_id)
+    if user is not None:
+        return user
+    version = user_snapshot_cache.version
+    cache_key = f'{settings.USER_CACHE_REDIS_PREFIX}:{user_id}'
+    cache_user = await redis_client.get(cache_key)
+    if cache_user:
+        user_snapshot_counter['redis_hits'] += 1
+        user = CurrentUserIns.model_validate_json(cache_user)
+    else:
+        from backend.app.admin.crud.crud_user import user_dao
+
+        user_snapshot_counter['db_loads'] += 1
+        async with async_db_session() as db:
+            current_user = await user_dao.get(db, user_id)
+        if not current_user:
+            return None
+        user = CurrentUserIns.model_validate(current_user)
+        await redis_client.setex(cache_key, settings.USER_CACHE_EXPIRE_SECONDS, user.model_dump_json())
+    user_snapshot_cache.set(user_id, user, version)
+    return user
+
+
+async def invalidate_user_snapshot(user_id: int) -> None:
+    """
+    使用户快照缓存失效，用户信息变更后调用
+
+    :param user_id:
+    :return:
+    """
+    await redis_client.delete(f'{settings.USER_CACHE_REDIS_PREFIX}:{user_id}')
+    await user_snapshot_cache.invalidate(user_id)
+
+
+def user_snapshot_stats() -> dict:
+    """
+    用户快照缓存统计信息
+
+    :return:
+    """
+    local_hits = user_snapshot_cache.hits
+    redis_hits = user_snapshot_counter['redis_hits']
+    db_loads = user_snapshot_counter['db_loads']
+    total = local_hits + redis_hits + db_loads
+    return {
+        'local': user_snapshot_cache.stats(),
+        'redis_hits': redis_hits,
+        'db_loads': db_loads,
+        'hit_rate': round((local_hits + redis_hits) / total, 4) if total else 0.0,
+    }
+
+
+async def get_current_user(token: str = Depends(oauth2_schema)) -> CurrentUserIns:
     """
     通过 token 获取当前用户
 
-    :param db:
     :param token:
     :return:
     """
-    user_id = jwt_decode(token)
-    from backend.app.admin.crud.crud_user import user_dao
-
-    user = await user_dao.get(db, user_id)
+    token_payload = jwt_decode(token)
+    if await token_revocation.is_revoked(token_payload.jti):
+        raise TokenError(msg='Token 已失效')
+    user = await get_user_snapshot(token_payload.id)
     if not user:
         raise TokenError(msg='Token 无效')
     if not user.status:
@@ -103,7 +266,7 @@ async def get_current_user(db: CurrentSession, token: str = Depends(oauth2_schem
     return user
 
 
-def superuser_verify(user: User):
+def superuser_verify(user: User | CurrentUserIns):
     """
     验证当前用户是否为超级用户
 
@@ -117,6 +280,6 @@ def superuser_verify(user: User):
 
 
 # 用户依赖注入
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[CurrentUserIns, Depends(get_current_user)]
 # 权限依赖注入
 DependsJwtAuth = Depends(get_current_user)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.database.redis import redis_client
+from backend.utils.bloom_filter import BloomFilter
+
+
+class TokenRevocation:
+    """
+    token 吊销列表
+
+    吊销记录保存在 redis 有序集合中（score 为 token 过期时间），每个工作进程在内存中维护吊销 jti 的布隆过滤器，
+    并通过 redis 发布订阅保持同步；仅当布隆过滤器判断可能已吊销时才访问 redis，订阅中断期间回退为直接查询 redis
+    """
+
+    def __init__(self):
+        self._bloom = self._new_bloom()
+        self._synced = False
+        self._task: asyncio.Task | None = None
+        self.redis_checks = 0
+
+    @staticmethod
+    def _new_bloom(size: int = 0) -> BloomFilter:
+        capacity = max(settings.TOKEN_REVOKED_BLOOM_CAPACITY, size * 2)
+        return BloomFilter(capacity, settings.TOKEN_REVOKED_BLOOM_ERROR_RATE)
+
+    async def rebuild(self) -> None:
+        """
+        从 redis 重建布隆过滤器，同时清理已过期的吊销记录
+
+        :return:
+        """
+        now = int(time.time())
+        await redis_client.zremrangebyscore(settings.TOKEN_REVOKED_REDIS_KEY, '-inf', now)
+        jtis = await redis_client.zrangebyscore(settings.TOKEN_REVOKED_REDIS_KEY, now, '+inf')
+        bloom = self._new_bloom(len(jtis))
+        for jti in jtis:
+            bloom.add(jti)
+        self._bloom = bloom
+
+    async def revoke(self, jti: str, expire_time: int) -> bool:
+        """
+        吊销 token
+
+        :param jti: token 唯一标识
+        :param expire_time: token 过期时间戳
+        :return: 本次调用是否新增了吊销记录
+        """
+        added = await redis_client.zadd(settings.TOKEN_REVOKED_REDIS_KEY, {jti: expire_time}, nx=True)
+        self._bloom.add(jti)
+        await redis_client.publish(settings.TOKEN_REVOKED_CHANNEL, jti)
+        return bool(added)
+
+    async def is_revoked(self, jti: str) -> bool:
+        """
+        检查 token 是否已吊销
+
+        :param jti: token 唯一标识
+        :return:
+        """
+        if self._synced and jti not in self._bloom:
+            return False
+        self.redis_checks += 1
+        return await redis_client.zscore(settings.TOKEN_REVOKED_REDIS_KEY, jti) is not None
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(settings.TOKEN_REVOKED_CHANNEL)
+                await self.rebuild()
+                self._synced = True
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message:
+                        self._bloom.add(message['data'])
+                    if self._bloom.is_full:
+                        await self.rebuild()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._synced = False
+                log.warning('token 吊销列表订阅中断，即将重试: {}', e)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def start(self) -> None:
+        """
+        启动吊销列表同步任务
+
+        :return:
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """
+        停止吊销列表同步任务
+
+        :return:
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._synced = False
+
+    def stats(self) -> dict:
+        """
+        吊销列表统计信息
+
+        :return:
+        """
+        return {
+            'synced': self._synced,
+            'bloom_count': self._bloom.count,
+            'bloom_capacity': self._bloom.capacity,
+            'redis_checks': self.redis_checks,
+        }
+
+
+token_revocation: TokenRevocation = TokenRevocation()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+from backend.app.admin.schema.user import CurrentUserIns
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.database.redis import redis_client
+from backend.utils.cache import LRUCache
+
+
+class UserSnapshotCache:
+    """
+    用户快照进程内缓存
+
+    每个工作进程独立缓存，失效消息通过 redis 发布订阅广播到所有工作进程；订阅中断期间不使用进程内缓存，
+    避免停用、删除或权限变更后其他工作进程继续使用旧快照
+    """
+
+    def __init__(self):
+        self._cache: LRUCache[int, CurrentUserIns] = LRUCache(
+            maxsize=settings.USER_CACHE_LOCAL_MAXSIZE, ttl=settings.USER_CACHE_LOCAL_EXPIRE_SECONDS
+        )
+        self._synced = False
+        self._task: asyncio.Task | None = None
+        # 失效版本号，加载期间发生失效时放弃写入缓存
+        self.version = 0
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    def get(self, user_id: int) -> CurrentUserIns | None:
+        """
+        获取用户快照
+
+        :param user_id:
+        :return:
+        """
+        if not self._synced:
+            return None
+        return self._cache.get(user_id)
+
+    def set(self, user_id: int, user: CurrentUserIns, version: int) -> None:
+        """
+        缓存用户快照
+
+        :param user_id:
+        :param user:
+        :param version: 开始加载时的失效版本号
+        :return:
+        """
+        if self._synced and version == self.version:
+            self._cache.set(user_id, user)
+
+    def _evict(self, user_id: int | None = None) -> None:
+        self.version += 1
+        if user_id is None:
+            self._cache.clear()
+        else:
+            self._cache.delete(user_id)
+
+    async def invalidate(self, user_id: int) -> None:
+        """
+        使所有工作进程中的用户快照失效
+
+        :param user_id:
+        :return:
+        """
+        self._evict(user_id)
+        await redis_client.publish(settings.USER_CACHE_INVALIDATE_CHANNEL, user_id)
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(settings.USER_CACHE_INVALIDATE_CHANNEL)
+                # 订阅前可能错过失效消息
+                self._evict()
+                self._synced = True
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message:
+                        self._evict(int(message['data']))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._synced = False
+                self._evict()
+                log.warning('用户快照失效订阅中断，即将重试: {}', e)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def start(self) -> None:
+        """
+        启动失效消息订阅任务
+
+        :return:
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """
+        停止失效消息订阅任务
+
+        :return:
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._synced = False
+        self._evict()
+
+    def stats(self) -> dict:
+        """
+        缓存统计信息
+
+        :return:
+        """
+        return {'synced': self._synced, **self._cache.stats()}
+
+
+user_snapshot_cache: UserSnapshotCache = UserSnapshotCache()
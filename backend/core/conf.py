@@ -46,12 +46,29 @@ class Settings(BaseSettings):
         if values['ENVIRONMENT'] == 'pro':
             values['FASTAPI_OPENAPI_URL'] = None
             values['FASTAPI_STATIC_FILES'] = False
+            values.setdefault('DATABASE_SCHEMA_MODE', 'skip')
         return values
 
     # MYSQL
     DATABASE_ECHO: bool = False
     DATABASE_SCHEMA: str = 'fsm'
     DATABASE_CHARSET: str = 'utf8mb4'
+    # 启动时表结构处理方式：create 自动建表，check 校验 alembic 版本，skip 跳过（生产环境默认）
+    DATABASE_SCHEMA_MODE: Literal['create', 'check', 'skip'] = 'create'
+    DATABASE_POOL_SIZE: int = 10  # 连接池常驻连接数
+    DATABASE_POOL_MAX_OVERFLOW: int = 20  # 连接池最大溢出连接数
+    DATABASE_POOL_TIMEOUT: int = 30  # 连接池检出超时时间，单位：秒
+    DATABASE_POOL_RECYCLE: int = 3600  # 连接回收时间，单位：秒，应小于 MySQL wait_timeout
+    DATABASE_POOL_USE_LIFO: bool = False  # 后进先出检出连接，便于空闲连接自然回收
+    DATABASE_POOL_WARMUP: bool = True  # 启动时预热连接池
+    DATABASE_POOL_WARMUP_SIZE: int | None = None  # 预热连接数，默认为连接池常驻连接数
+    DATABASE_POOL_PING_IDLE_SECONDS: float = 30  # 空闲超过此时间的连接检出前探活，单位：秒，负数表示不探活
+    DATABASE_SLOW_QUERY_MS: int = 200  # 慢查询阈值，单位：毫秒
+    DATABASE_REPEATED_QUERY_THRESHOLD: int = 10  # 同一请求内相同语句执行次数超过此值时告警
+    DATABASE_REPLICA_URLS: list[str] = []  # 只读副本连接地址
+    DATABASE_REPLICA_RETRY_SECONDS: int = 30  # 只读副本故障后回退至主库的时间，单位：秒
+    DATABASE_REPLICA_STICKY_SECONDS: int = 5  # 写请求后读请求路由至主库的时间，单位：秒
+    DATABASE_REPLICA_STICKY_REDIS_PREFIX: str = 'fba:db:sticky'
 
     # Redis
     REDIS_TIMEOUT: int = 10
@@ -59,11 +76,66 @@ class Settings(BaseSettings):
     # Captcha
     CAPTCHA_LOGIN_REDIS_PREFIX: str = 'fba:login:captcha'
     CAPTCHA_LOGIN_EXPIRE_SECONDS: int = 60 * 5  # 过期时间，单位：秒
+    CAPTCHA_IMAGE_FORMAT: Literal['png', 'webp'] = 'webp'  # 图片格式，webp 体积小于 png 及原 jpeg
+    CAPTCHA_IMAGE_WEBP_QUALITY: int = 60  # webp 图片质量
+    CAPTCHA_UUID_HEADER: str = 'X-Captcha-UUID'  # 二进制验证码接口返回 uuid 的响应头
+    CAPTCHA_POOL_ENABLED: bool = True  # 是否启用验证码预生成池
+    CAPTCHA_POOL_LOW_WATERMARK: int = 20  # 预生成池低水位，低于此数量时开始补充
+    CAPTCHA_POOL_HIGH_WATERMARK: int = 100  # 预生成池高水位，补充至此数量
 
     # Token
     TOKEN_ALGORITHM: str = 'HS256'  # 算法
     TOKEN_EXPIRE_SECONDS: int = 60 * 60 * 24 * 1  # 过期时间，单位：秒
+    TOKEN_REFRESH_EXPIRE_SECONDS: int = 60 * 60 * 24 * 7  # 刷新 token 过期时间，单位：秒
     TOKEN_URL_SWAGGER: str = f'{FASTAPI_API_V1_PATH}/auth/login/swagger'
+    TOKEN_REVOKED_REDIS_KEY: str = 'fba:token:revoked'
+    TOKEN_REVOKED_CHANNEL: str = 'fba:token:revoked'
+    TOKEN_REVOKED_BLOOM_CAPACITY: int = 100000  # 吊销列表布隆过滤器预期容量
+    TOKEN_REVOKED_BLOOM_ERROR_RATE: float = 0.001  # 吊销列表布隆过滤器预期误判率
+
+    # Password hash pool
+    # 每个 web 工作进程独立创建进程池，子进程总数为 web 工作进程数 × 此值，建议两者乘积不超过 CPU 核数
+    PASSWORD_HASH_POOL_SIZE: int = 1  # 密码哈希进程池大小
+    PASSWORD_HASH_POOL_MAX_QUEUE: int = 32  # 密码哈希最大排队任务数
+    PASSWORD_HASH_POOL_TIMEOUT: float = 3  # 密码哈希等待超时时间，单位：秒
+
+    # Token cache
+    TOKEN_CACHE_MAXSIZE: int = 10000  # 已验证 token 进程内缓存最大条目数
+    TOKEN_CACHE_EXPIRE_SECONDS: int = 60 * 5  # 已验证 token 进程内缓存过期时间，单位：秒
+    TOKEN_INVALID_CACHE_MAXSIZE: int = 1000  # 无效 token 进程内缓存最大条目数
+    TOKEN_INVALID_CACHE_EXPIRE_SECONDS: int = 60  # 无效 token 进程内缓存过期时间，单位：秒
+
+    # User cache
+    USER_CACHE_REDIS_PREFIX: str = 'fba:user:snapshot'
+    USER_CACHE_EXPIRE_SECONDS: int = 60 * 5  # 过期时间，单位：秒
+    USER_CACHE_LOCAL_MAXSIZE: int = 1024  # 进程内缓存最大条目数
+    USER_CACHE_LOCAL_EXPIRE_SECONDS: int = 10  # 进程内缓存过期时间，单位：秒
+    USER_CACHE_INVALIDATE_CHANNEL: str = 'fba:user:snapshot:invalidate'
+
+    # User search
+    USER_SEARCH_NGRAM_TOKEN_SIZE: int = 2  # 需与 MySQL ngram_token_size 保持一致，短于此长度的关键词回退为 LIKE 查询
+    # 需与 MySQL 全文索引停用词表保持一致，ngram 分词会丢弃包含停用词的词元，包含停用词的关键词回退为 LIKE 查询；
+    # 默认与 docker-compose 中 innodb_ft_enable_stopword=0 一致，启用时需配置为 InnoDB 内置停用词
+    USER_SEARCH_NGRAM_STOPWORDS: set[str] = set()
+
+    # User suggest
+    USER_SUGGEST_REDIS_KEY: str = 'fba:user:suggest'
+    USER_SUGGEST_MAX_LIMIT: int = 20  # 单次返回最大数量
+    USER_SUGGEST_REBUILD_LOCK_SECONDS: int = 60 * 5  # 重建锁过期时间，单位：秒
+    USER_SUGGEST_REBUILD_BATCH_SIZE: int = 5000  # 重建时服务端游标每批读取数量
+
+    # User export
+    USER_EXPORT_YIELD_PER: int = 1000  # 服务端游标每批读取数量
+
+    # User login time
+    USER_LOGIN_TIME_FLUSH_INTERVAL_SECONDS: float = 1  # 检查间隔时间，单位：秒
+    USER_LOGIN_TIME_FLUSH_MAX_LAG_SECONDS: float = 10  # 最大写入延迟，单位：秒
+    USER_LOGIN_TIME_FLUSH_BATCH_SIZE: int = 500  # 单批最大写入数量，达到后立即写入
+
+    # Pagination
+    PAGINATION_COUNT_REDIS_PREFIX: str = 'fba:pagination:count'
+    PAGINATION_COUNT_EXPIRE_SECONDS: int = 60  # 分页总数缓存过期时间，单位：秒
+    PAGINATION_DEFERRED_JOIN_OFFSET: int = 1000  # OFFSET 达到此值时改写为延迟关联，0 表示禁用
 
     # Log
     LOG_ROOT_LEVEL: str = 'NOTSET'
@@ -84,6 +156,7 @@ class Settings(BaseSettings):
     ]
     CORS_EXPOSE_HEADERS: list[str] = [
         '*',
+        CAPTCHA_UUID_HEADER,
     ]
 
     # DateTime
@@ -98,6 +171,7 @@ class Settings(BaseSettings):
     DEMO_MODE_EXCLUDE: set[tuple[str, str]] = {
         ('POST', f'{FASTAPI_API_V1_PATH}/auth/login'),
         ('POST', f'{FASTAPI_API_V1_PATH}/auth/logout'),
+        ('POST', f'{FASTAPI_API_V1_PATH}/auth/token/refresh'),
         ('GET', f'{FASTAPI_API_V1_PATH}/auth/captcha'),
     }
 
@@ -7,8 +7,11 @@ from pathlib import Path
 # 或使用绝对路径，指到backend目录为止，例如windows：BasePath = D:\git_project\fastapi_mysql
 BasePath = Path(__file__).resolve().parent.parent
 
+# alembic 迁移脚本目录
+ALEMBIC_DIR = os.path.join(BasePath, 'alembic')
+
 # alembic 迁移文件存放路径
-ALEMBIC_VERSIONS_DIR = os.path.join(BasePath, 'alembic', 'versions')
+ALEMBIC_VERSIONS_DIR = os.path.join(ALEMBIC_DIR, 'versions')
 
 # 日志文件路径
 LOG_DIR = os.path.join(BasePath, 'log')
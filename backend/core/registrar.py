@@ -1,22 +1,43 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import asyncio
 import os.path
+import time
+
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Depends
 from fastapi_limiter import FastAPILimiter
 from fastapi_pagination import add_pagination
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
+from backend.app.admin.crud.crud_user import user_dao
+from backend.app.admin.service.captcha_service import captcha_service
+from backend.app.admin.service.login_time_service import login_time_service
+from backend.app.admin.service.user_suggest_service import user_suggest_service
 from backend.app.router import route
 from backend.common.exception.exception_handler import register_exception
-from backend.common.log import setup_logging, set_customize_logfile
+from backend.common.log import log, setup_logging, set_customize_logfile
+from backend.common.security.jwt import password_hash_pool
+from backend.common.security.revocation import token_revocation
+from backend.common.security.user_snapshot import user_snapshot_cache
 from backend.core.path_conf import STATIC_DIR
 from backend.database.redis import redis_client
 from backend.core.conf import settings
-from backend.database.db import create_table
+from backend.database.db import (
+    async_db_session,
+    async_engine,
+    check_alembic_version,
+    create_table,
+    replica_set,
+    replica_sticky,
+    request_unit_of_work,
+    warmup_pool,
+)
 from backend.utils.demo_site import demo_site
 from backend.utils.health_check import http_limit_callback, ensure_unique_route_names
 from backend.utils.openapi import simplify_operation_ids
+from backend.utils.serializers import MsgSpecJSONResponse
 
 
 @asynccontextmanager
@@ -26,21 +47,84 @@ async def register_init(app: FastAPI):
 
     :return:
     """
-    # 创建数据库表
-    await create_table()
+    start_time = time.perf_counter()
+    # 数据库表结构
+    if settings.DATABASE_SCHEMA_MODE == 'create':
+        await create_table()
+    elif settings.DATABASE_SCHEMA_MODE == 'check':
+        await check_alembic_version()
+    # 预热数据库连接池
+    if settings.DATABASE_POOL_WARMUP:
+        await register_db_warmup()
     # 连接 redis
     await redis_client.open()
     # 初始化 limiter
     await FastAPILimiter.init(
         redis_client, prefix=settings.REQUEST_LIMITER_REDIS_PREFIX, http_callback=http_limit_callback
     )
+    # 同步 token 吊销列表
+    token_revocation.start()
+    # 同步用户快照失效
+    user_snapshot_cache.start()
+    # 启动登录时间延迟写入
+    login_time_service.start()
+    # 启动验证码预生成
+    captcha_service.start()
+    # 冷启动时重建用户名自动补全索引
+    user_suggest_service.start()
+    elapsed = (time.perf_counter() - start_time) * 1000
+    log.info('服务启动完成，表结构处理方式 {}，耗时 {:.1f}ms', settings.DATABASE_SCHEMA_MODE, elapsed)
 
     yield
 
+    # 停止用户名自动补全索引重建
+    await user_suggest_service.stop()
+    # 停止验证码预生成
+    await captcha_service.stop()
+    # 停止登录时间延迟写入
+    await login_time_service.stop()
+    # 停止 token 吊销列表同步
+    await token_revocation.stop()
+    # 停止用户快照失效同步
+    await user_snapshot_cache.stop()
     # 关闭 redis 连接
     await redis_client.close()
     # 关闭 limiter
     await FastAPILimiter.close()
+    # 关闭密码哈希进程池
+    password_hash_pool.shutdown()
+
+
+async def register_db_warmup() -> None:
+    """
+    预热数据库连接池及 SQL 编译缓存
+
+    :return:
+    """
+    start_time = time.perf_counter()
+    size = settings.DATABASE_POOL_WARMUP_SIZE or settings.DATABASE_POOL_SIZE
+
+    async def warmup(engine: AsyncEngine, session_maker: async_sessionmaker[AsyncSession]) -> None:
+        # SQL 编译缓存按引擎隔离，承担读请求的每个引擎都需预热
+        await warmup_pool(engine, size)
+        async with session_maker() as db:
+            await user_dao.warmup(db)
+
+    replicas = replica_set.replicas
+    results = await asyncio.gather(
+        warmup(async_engine, async_db_session),
+        *(warmup(replica.engine, replica.session_maker) for replica in replicas),
+        return_exceptions=True,
+    )
+    if isinstance(results[0], Exception):
+        log.error('❌ 数据库主库连接池预热失败: {}', results[0])
+    for replica, result in zip(replicas, results[1:]):
+        # 单个副本不可达不影响启动，标记为不可用后读请求回退至主库
+        if isinstance(result, Exception):
+            log.error('❌ 数据库只读副本 {} 连接池预热失败: {}', replica.name, result)
+            replica.mark_unhealthy()
+    elapsed = (time.perf_counter() - start_time) * 1000
+    log.info('数据库连接池预热完成，每个引擎 {} 个连接，耗时 {:.1f}ms', size, elapsed)
 
 
 def register_app():
@@ -53,6 +137,7 @@ def register_app():
         redoc_url=settings.FASTAPI_REDOC_URL,
         openapi_url=settings.FASTAPI_OPENAPI_URL,
         lifespan=register_init,
+        default_response_class=MsgSpecJSONResponse,
     )
     # 日志
     register_logger()
@@ -117,6 +202,7 @@ def register_middleware(app) -> None:
             allow_credentials=True,
             allow_methods=['*'],
             allow_headers=['*'],
+            expose_headers=settings.CORS_EXPOSE_HEADERS,
         )
 
 
@@ -127,7 +213,11 @@ def register_router(app: FastAPI):
     :param app: FastAPI
     :return:
     """
-    dependencies = [Depends(demo_site)] if settings.DEMO_MODE else None
+    dependencies = [Depends(demo_site)] if settings.DEMO_MODE else []
+    if settings.DATABASE_REPLICA_URLS:
+        dependencies.append(Depends(replica_sticky))
+    # 请求级数据库工作单元
+    dependencies.append(Depends(request_unit_of_work))
 
     # API
     app.include_router(route, dependencies=dependencies)
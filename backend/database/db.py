@@ -1,23 +1,48 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import asyncio
+import hashlib
 import sys
 
-from typing import Annotated
+from contextlib import AsyncExitStack, asynccontextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import Annotated, Any, AsyncIterator, Awaitable, Callable
 from uuid import uuid4
 
-from fastapi import Depends
-from sqlalchemy import URL
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from alembic.script import ScriptDirectory
+from fastapi import Depends, Request
+from sqlalchemy import URL, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from backend.common.log import log
 from backend.common.model import MappedBase
 from backend.core.conf import settings
+from backend.core.path_conf import ALEMBIC_DIR
+from backend.database.pool import InstrumentedAsyncQueuePool, enable_idle_ping, instrument_pool
+from backend.database.query_stats import instrument_queries
+from backend.database.redis import redis_client
+from backend.database.replica import Replica, ReplicaSet
 
 
 def create_engine_and_session(url: str | URL):
     try:
         # 数据库引擎
-        engine = create_async_engine(url, echo=settings.DATABASE_ECHO, future=True, pool_pre_ping=True)
+        engine = create_async_engine(
+            url,
+            echo=settings.DATABASE_ECHO,
+            future=True,
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_POOL_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+            pool_use_lifo=settings.DATABASE_POOL_USE_LIFO,
+        )
+        instrument_pool(engine)
+        instrument_queries(engine)
+        if settings.DATABASE_POOL_PING_IDLE_SECONDS >= 0:
+            enable_idle_ping(engine, settings.DATABASE_POOL_PING_IDLE_SECONDS)
         # log.success('数据库连接成功')
     except Exception as e:
         log.error('❌ 数据库链接失败 {}', e)
@@ -34,29 +59,225 @@ SQLALCHEMY_DATABASE_URL = (
 
 async_engine, async_db_session = create_engine_and_session(SQLALCHEMY_DATABASE_URL)
 
+# 只读副本
+replica_set = ReplicaSet([
+    Replica(f'replica_{i}', *create_engine_and_session(url)) for i, url in enumerate(settings.DATABASE_REPLICA_URLS)
+])
 
-async def get_db() -> AsyncSession:
-    """session 生成器"""
-    session = async_db_session()
+# 当前请求客户端标识，用于读写一致性
+_replica_client_key: ContextVar[str | None] = ContextVar('replica_client_key', default=None)
+
+
+class UnitOfWork:
+    """
+    请求级数据库工作单元
+
+    同一请求内的鉴权、接口及服务共享同一个 session，session 在首次使用时才检出连接，
+    并在请求结束时统一提交或回滚
+    """
+
+    def __init__(self):
+        self._session: AsyncSession | None = None
+        self._read_session: AsyncSession | None = None
+        self._after_commit: list[partial[Awaitable[Any]]] = []
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = async_db_session()
+        return self._session
+
+    async def read_session(self) -> AsyncSession:
+        """
+        获取只读 session，已使用主库 session 或无可用副本时复用主库 session
+
+        :return:
+        """
+        if self._session is not None:
+            return self._session
+        if self._read_session is None:
+            session_maker = await get_read_sessionmaker()
+            if session_maker is async_db_session:
+                return self.session
+            self._read_session = session_maker()
+        return self._read_session
+
+    def after_commit(self, fn: Callable[..., Awaitable[Any]], *args: Any) -> None:
+        """
+        注册提交成功后执行的回调
+
+        :param fn:
+        :param args:
+        :return:
+        """
+        self._after_commit.append(partial(fn, *args))
+
+    async def commit(self) -> None:
+        if self._session is not None and self._session.in_transaction():
+            await self._session.commit()
+
+    async def run_after_commit(self) -> None:
+        """
+        执行提交成功后的回调，数据已提交，单个回调失败仅记录日志，不影响其余回调及请求结果
+
+        :return:
+        """
+        for fn in self._after_commit:
+            try:
+                await fn()
+            except Exception as e:
+                log.error('❌ 数据库提交后回调 {} 执行失败: {}', getattr(fn.func, '__qualname__', fn.func), e)
+
+    async def rollback(self) -> None:
+        for session in (self._session, self._read_session):
+            if session is not None:
+                await session.rollback()
+
+    async def close(self) -> None:
+        for session in (self._session, self._read_session):
+            if session is not None:
+                await session.close()
+
+
+_unit_of_work: ContextVar[UnitOfWork | None] = ContextVar('unit_of_work', default=None)
+
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncIterator[UnitOfWork]:
+    """请求级数据库工作单元上下文管理器，正常退出时提交，异常时回滚"""
+    uow = UnitOfWork()
+    token = _unit_of_work.set(uow)
     try:
-        yield session
-    except Exception as se:
-        await session.rollback()
-        raise se
+        yield uow
+        await uow.commit()
+    except Exception:
+        await uow.rollback()
+        raise
+    else:
+        await uow.run_after_commit()
     finally:
-        await session.close()
+        await uow.close()
+        _unit_of_work.reset(token)
+
+
+async def request_unit_of_work() -> AsyncIterator[None]:
+    """请求级数据库工作单元依赖"""
+    async with unit_of_work():
+        yield
+
+
+def current_unit_of_work() -> UnitOfWork:
+    """
+    获取当前请求的数据库工作单元
+
+    :return:
+    """
+    uow = _unit_of_work.get()
+    if uow is None:
+        raise RuntimeError('当前上下文不存在数据库工作单元')
+    return uow
+
+
+def current_session() -> AsyncSession:
+    """获取当前请求的 session"""
+    return current_unit_of_work().session
+
+
+async def current_read_session() -> AsyncSession:
+    """获取当前请求的只读 session"""
+    return await current_unit_of_work().read_session()
+
+
+async def get_db() -> AsyncSession:
+    """当前请求 session 依赖"""
+    return current_session()
 
 
 # Session Annotated
 CurrentSession = Annotated[AsyncSession, Depends(get_db)]
 
 
+async def replica_sticky(request: Request) -> AsyncIterator[None]:
+    """
+    只读副本读写一致性依赖，客户端写请求之后的一段时间内，其读请求将路由至主库
+
+    :param request:
+    :return:
+    """
+    identity = request.headers.get('Authorization') or (request.client.host if request.client else '')
+    client_key = hashlib.sha256(identity.encode()).hexdigest()
+    token = _replica_client_key.set(client_key)
+    try:
+        yield
+    finally:
+        _replica_client_key.reset(token)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            await redis_client.setex(
+                f'{settings.DATABASE_REPLICA_STICKY_REDIS_PREFIX}:{client_key}',
+                settings.DATABASE_REPLICA_STICKY_SECONDS,
+                1,
+            )
+
+
+async def get_read_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """
+    获取只读 session 工厂，无可用副本或当前客户端处于读写一致性窗口内时使用主库
+
+    :return:
+    """
+    if not replica_set:
+        return async_db_session
+    client_key = _replica_client_key.get()
+    if client_key and await redis_client.exists(f'{settings.DATABASE_REPLICA_STICKY_REDIS_PREFIX}:{client_key}'):
+        return async_db_session
+    replica = replica_set.choose()
+    return replica.session_maker if replica else async_db_session
+
+
+async def get_read_db() -> AsyncSession:
+    """当前请求只读 session 依赖"""
+    return await current_read_session()
+
+
+# Read Session Annotated
+CurrentReadSession = Annotated[AsyncSession, Depends(get_read_db)]
+
+
 async def create_table():
     """创建数据库表"""
     async with async_engine.begin() as coon:
         await coon.run_sync(MappedBase.metadata.create_all)
 
 
+async def check_alembic_version() -> None:
+    """校验数据库 alembic 版本与迁移脚本最新版本是否一致，不一致时终止启动"""
+    try:
+        heads = set(ScriptDirectory(ALEMBIC_DIR).get_heads())
+        async with async_engine.connect() as conn:
+            result = await conn.execute(text('SELECT version_num FROM alembic_version'))
+            versions = set(result.scalars().all())
+    except Exception as e:
+        log.error('❌ 数据库 alembic 版本校验失败 {}', e)
+        sys.exit()
+    if not heads or versions != heads:
+        log.error('❌ 数据库版本 {} 与迁移版本 {} 不一致', versions, heads)
+        sys.exit()
+
+
+async def warmup_pool(engine: AsyncEngine, size: int) -> None:
+    """
+    并发建立指定数量的连接并归还连接池，避免首批请求承担建立连接的开销
+
+    :param engine:
+    :param size: 预热连接数，不超过连接池常驻连接数
+    :return:
+    """
+    size = min(size, settings.DATABASE_POOL_SIZE)
+    async with AsyncExitStack() as stack:
+        conns = await asyncio.gather(*(stack.enter_async_context(engine.connect()) for _ in range(size)))
+        await asyncio.gather(*(conn.execute(text('SELECT 1')) for conn in conns))
+
+
 def uuid4_str() -> str:
     """数据库引擎 UUID 类型兼容性解决方案"""
     return str(uuid4())
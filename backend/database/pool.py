@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+
+class PoolStats:
+    """数据库连接池统计信息"""
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidated = 0
+        self.pings = 0
+        self.ping_failures = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.wait_count += 1
+        self.wait_total += seconds
+        if seconds > self.wait_max:
+            self.wait_max = seconds
+
+    def snapshot(self, pool: Pool) -> dict:
+        """
+        获取统计快照
+
+        :param pool:
+        :return:
+        """
+        return {
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'in_use': pool.checkedout(),
+            'overflow': max(pool.overflow(), 0),
+            'connects': self.connects,
+            'checkouts': self.checkouts,
+            'checkins': self.checkins,
+            'invalidated': self.invalidated,
+            'pings': self.pings,
+            'ping_failures': self.ping_failures,
+            'wait_avg_ms': round(self.wait_total / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+            'wait_max_ms': round(self.wait_max * 1000, 3),
+        }
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    记录连接检出等待时间的连接池
+
+    连接池事件中没有检出开始事件，因此通过重写 _do_get 记录等待时间（包含新建连接耗时）
+    """
+
+    stats: PoolStats
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.stats.record_wait(time.perf_counter() - start)
+
+    def recreate(self) -> 'InstrumentedAsyncQueuePool':
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def instrument_pool(engine: AsyncEngine) -> None:
+    """
+    注册连接池事件，记录连接池统计信息
+
+    :param engine:
+    :return:
+    """
+
+    def _stats() -> PoolStats:
+        return engine.sync_engine.pool.stats
+
+    @event.listens_for(engine.sync_engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        _stats().connects += 1
+
+    @event.listens_for(engine.sync_engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        _stats().checkouts += 1
+
+    @event.listens_for(engine.sync_engine, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        _stats().checkins += 1
+
+    @event.listens_for(engine.sync_engine, 'invalidate')
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        _stats().invalidated += 1
+
+
+def enable_idle_ping(engine: AsyncEngine, idle_seconds: float) -> None:
+    """
+    空闲连接检出前探活，替代每次检出都探活的 pool_pre_ping
+
+    仅对空闲时间超过阈值的连接执行 ping，探活失败时抛出 DisconnectionError，连接池将废弃该连接并透明地重新检出
+
+    :param engine:
+    :param idle_seconds: 空闲时间阈值，单位：秒
+    :return:
+    """
+    dialect = engine.sync_engine.dialect
+
+    @event.listens_for(engine.sync_engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        connection_record.info['checkin_time'] = time.monotonic()
+
+    @event.listens_for(engine.sync_engine, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        connection_record.info['checkin_time'] = time.monotonic()
+
+    @event.listens_for(engine.sync_engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checkin_time = connection_record.info.get('checkin_time')
+        if checkin_time is None or time.monotonic() - checkin_time < idle_seconds:
+            return
+        stats = engine.sync_engine.pool.stats
+        stats.pings += 1
+        try:
+            dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            stats.ping_failures += 1
+            raise DisconnectionError() from e
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    """
+    获取引擎连接池统计信息
+
+    :param engine:
+    :return:
+    """
+    pool = engine.sync_engine.pool
+    return pool.stats.snapshot(pool)
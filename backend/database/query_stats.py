@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import re
+import time
+
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.common.log import log
+from backend.core.conf import settings
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?|:\w+|__\[POSTCOMPILE_\w+\])\s*,?)+\)', re.IGNORECASE)
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(statement: str) -> str:
+    """
+    归一化 SQL 语句，去除字面值及多余空白，便于聚合相同语句
+
+    :param statement:
+    :return:
+    """
+    sql = _STRING_RE.sub('?', statement)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    return _WHITESPACE_RE.sub(' ', sql).strip()
+
+
+class QueryStats:
+    """请求级 SQL 执行统计"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement: str | None = None
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total += elapsed
+        self.statements[statement] += 1
+        if elapsed > self.slowest:
+            self.slowest = elapsed
+            self.slowest_statement = statement
+
+    def repeated(self) -> list[tuple[str, int]]:
+        """
+        获取重复执行次数超过阈值的语句，通常意味着 N+1 查询
+
+        :return:
+        """
+        threshold = settings.DATABASE_REPEATED_QUERY_THRESHOLD
+        return [(sql, n) for sql, n in self.statements.items() if n > threshold]
+
+
+query_stats_ctx: ContextVar[QueryStats | None] = ContextVar('query_stats', default=None)
+
+
+def instrument_queries(engine: AsyncEngine) -> None:
+    """
+    注册 SQL 执行事件，记录请求级 SQL 执行统计及慢查询
+
+    :param engine:
+    :return:
+    """
+
+    # 开始时间记录在执行上下文上，语句执行失败时随上下文一并释放
+    @event.listens_for(engine.sync_engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_start_time = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, '_query_start_time', None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        stats = query_stats_ctx.get()
+        slow = elapsed * 1000 >= settings.DATABASE_SLOW_QUERY_MS
+        if stats is None and not slow:
+            return
+        sql = normalize_sql(statement)
+        if stats is not None:
+            stats.record(sql, elapsed)
+        if slow:
+            log.warning('慢查询 {:.1f}ms | {}', elapsed * 1000, sql)
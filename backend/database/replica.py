@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import itertools
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from backend.common.log import log
+from backend.core.conf import settings
+
+
+class Replica:
+    """数据库只读副本"""
+
+    def __init__(self, name: str, engine: AsyncEngine, session_maker: async_sessionmaker[AsyncSession]):
+        self.name = name
+        self.engine = engine
+        self.session_maker = session_maker
+        self.unhealthy_until = 0.0
+        event.listen(engine.sync_engine, 'handle_error', self._on_error)
+
+    @property
+    def healthy(self) -> bool:
+        return self.unhealthy_until <= time.monotonic()
+
+    def mark_unhealthy(self) -> None:
+        """暂时将副本标记为不可用，读请求回退至主库"""
+        retry_seconds = settings.DATABASE_REPLICA_RETRY_SECONDS
+        self.unhealthy_until = time.monotonic() + retry_seconds
+        log.warning('数据库只读副本 {} 不可用，{} 秒内回退至主库', self.name, retry_seconds)
+
+    def _on_error(self, context: ExceptionContext) -> None:
+        # 连接建立失败或连接断开时，暂时将副本标记为不可用
+        if context.is_disconnect or context.connection is None:
+            self.mark_unhealthy()
+
+
+class ReplicaSet:
+    """数据库只读副本集合，轮询选择可用副本"""
+
+    def __init__(self, replicas: list[Replica]):
+        self.replicas = replicas
+        self._cycle = itertools.cycle(replicas) if replicas else None
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self) -> Replica | None:
+        """
+        选择一个可用副本，全部不可用时返回 None
+
+        :return:
+        """
+        if self._cycle is None:
+            return None
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if replica.healthy:
+                return replica
+        return None
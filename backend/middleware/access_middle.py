@@ -4,6 +4,7 @@ from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 
 from backend.common.log import log
+from backend.database.query_stats import QueryStats, query_stats_ctx
 from backend.utils.timezone import timezone
 
 
@@ -12,10 +13,19 @@ class AccessMiddleware(BaseHTTPMiddleware):
 
     async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
         start_time = timezone.now()
-        response = await call_next(request)
+        query_stats = QueryStats()
+        token = query_stats_ctx.set(query_stats)
+        try:
+            response = await call_next(request)
+        finally:
+            query_stats_ctx.reset(token)
         end_time = timezone.now()
         log.info(
             f'{request.client.host: <15} | {request.method: <8} | {response.status_code: <6} | '
-            f'{request.url.path} | {round((end_time - start_time).total_seconds(), 3) * 1000.0}ms'
+            f'{request.url.path} | {round((end_time - start_time).total_seconds(), 3) * 1000.0}ms | '
+            f'sql {query_stats.count} {round(query_stats.total * 1000, 1)}ms '
+            f'slowest {round(query_stats.slowest * 1000, 1)}ms {query_stats.slowest_statement or ""}'
         )
+        for statement, count in query_stats.repeated():
+            log.warning(f'疑似 N+1 查询 | {request.method} {request.url.path} | 重复 {count} 次 | {statement}')
         return response
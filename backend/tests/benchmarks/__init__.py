@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能基准脚本，不由 pytest 收集，在项目根目录下执行，例如::
+
+    python -m backend.tests.benchmarks.bench_jwt_decode
+"""
+
+import backend.tests.conftest  # noqa: F401
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import tempfile
+import time
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from backend.app.admin.crud.crud_user import user_dao
+from backend.app.admin.model import User
+from backend.common.pagination import _deferred_join
+
+USERS = 1_000_000
+BATCH = 50_000
+LIMIT = 20
+OFFSETS = (1_000, 200_000, 900_000)
+ROUNDS = 3
+
+
+def _seed(path: str) -> None:
+    engine = create_engine(f'sqlite:///{path}')
+    User.__table__.create(engine)
+    start = datetime(2020, 1, 1)
+    with engine.begin() as conn:
+        for base in range(0, USERS, BATCH):
+            conn.execute(
+                insert(User.__table__),
+                [
+                    {
+                        'uuid': f'uuid-{i}',
+                        'username': f'user{i}',
+                        'password': 'x' * 60,
+                        'salt': b'$2b$12$' + b's' * 22,
+                        'email': f'user{i}@example.com',
+                        'status': 1,
+                        'is_superuser': False,
+                        'avatar': f'https://example.com/avatar/{i}.png',
+                        'phone': f'138{i:08d}',
+                        'join_time': start + timedelta(seconds=i),
+                    }
+                    for i in range(base, base + BATCH)
+                ],
+            )
+    engine.dispose()
+
+
+async def _measure(db: AsyncSession, stmt) -> tuple[float, list[int]]:
+    best = float('inf')
+    ids = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        ids = [user.id for user in (await db.execute(stmt)).scalars().all()]
+        best = min(best, time.perf_counter() - start)
+        db.expunge_all()
+    return best * 1000, ids
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        start = time.perf_counter()
+        _seed(path)
+        print(f'seeded {USERS} users in {time.perf_counter() - start:.1f}s (sqlite+aiosqlite)')
+        engine = create_async_engine(f'sqlite+aiosqlite:///{path}')
+        select = await user_dao.get_list()
+        print(f'ORDER BY join_time DESC, id DESC LIMIT {LIMIT}, ms per page (best of {ROUNDS})')
+        async with AsyncSession(engine) as db:
+            for offset in OFFSETS:
+                before, expected = await _measure(db, select.limit(LIMIT).offset(offset))
+                after, ids = await _measure(db, _deferred_join(select, LIMIT, offset))
+                assert ids == expected
+                print(f'offset {offset:>7}: before {before:8.2f}  deferred join {after:8.2f}  ({before / after:.1f}x)')
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
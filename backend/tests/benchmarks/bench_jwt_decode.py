@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import time
+
+from jose import jwt
+
+from backend.common.dataclasses import TokenPayload
+from backend.common.security.jwt import create_access_token, jwt_decode, token_cache
+from backend.core.conf import settings
+
+TOKENS = 10_000
+ROUNDS = 5
+
+
+def _uncached_decode(token: str) -> TokenPayload:
+    payload = jwt.decode(token, settings.TOKEN_SECRET_KEY, algorithms=[settings.TOKEN_ALGORITHM])
+    return TokenPayload(
+        id=int(payload['sub']),
+        jti=payload['jti'],
+        expire_time=int(payload['exp']),
+        token_type=payload['type'],
+    )
+
+
+def _measure(fn, tokens: list[str]) -> float:
+    start = time.perf_counter()
+    for token in tokens:
+        fn(token)
+    return (time.perf_counter() - start) / len(tokens) * 1_000_000
+
+
+def _measure_miss(tokens: list[str]) -> float:
+    token_cache.clear()
+    return _measure(jwt_decode, tokens)
+
+
+def main() -> None:
+    tokens = [create_access_token(str(i + 1)) for i in range(TOKENS)]
+    before = min(_measure(_uncached_decode, tokens) for _ in range(ROUNDS))
+    miss = min(_measure_miss(tokens) for _ in range(ROUNDS))
+    hit = min(_measure(jwt_decode, tokens) for _ in range(ROUNDS))
+    print(f'{TOKENS} distinct tokens, µs per decode')
+    print(f'before (jose decode):     {before:8.2f}')
+    print(f'after, first call (miss): {miss:8.2f}')
+    print(f'after, repeat (hit):      {hit:8.2f}  ({before / hit:.0f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.database.pool import InstrumentedAsyncQueuePool, enable_idle_ping, instrument_pool, pool_stats
+
+CHECKOUTS = 10_000
+ROUNDS = 5
+
+
+def _engine(pre_ping: bool):
+    engine = create_async_engine(
+        'sqlite+aiosqlite://', poolclass=InstrumentedAsyncQueuePool, pool_size=1, pool_pre_ping=pre_ping
+    )
+    instrument_pool(engine)
+    if not pre_ping:
+        enable_idle_ping(engine, 60)
+    return engine
+
+
+async def _measure(engine) -> float:
+    start = time.perf_counter()
+    for _ in range(CHECKOUTS):
+        async with engine.connect() as conn:
+            await conn.execute(text('SELECT 1'))
+    return (time.perf_counter() - start) / CHECKOUTS * 1_000_000
+
+
+async def _bench(pre_ping: bool) -> tuple[float, dict]:
+    engine = _engine(pre_ping)
+    await _measure(engine)
+    best = min([await _measure(engine) for _ in range(ROUNDS)])
+    stats = pool_stats(engine)
+    await engine.dispose()
+    return best, stats
+
+
+async def main() -> None:
+    before, _ = await _bench(pre_ping=True)
+    after, after_stats = await _bench(pre_ping=False)
+    print(f'{CHECKOUTS} checkouts + SELECT 1 on sqlite+aiosqlite, µs per checkout')
+    print(f'before (pool_pre_ping):   {before:8.2f}')
+    print(f'after (idle ping, 60s):   {after:8.2f}  pings={after_stats["pings"]}')
+    print(f'saved per checkout:       {before - after:8.2f}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
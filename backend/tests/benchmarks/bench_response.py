@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import time
+
+from typing import Any
+
+from fastapi._compat import ModelField
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from backend.app.admin.model import User
+from backend.app.admin.schema.user import GetUserInfo
+from backend.common.pagination import PageData
+from backend.common.response.response_code import CustomResponseCode
+from backend.common.response.response_schema import ResponseModel, ResponseSchemaModel, response_base
+from backend.utils.serializers import MsgSpecJSONResponse, select_as_dict
+
+PAGE_SIZE = 100
+ITERATIONS = 1_000
+ROUNDS = 5
+
+res = CustomResponseCode.HTTP_200
+
+
+def _users() -> list[User]:
+    users = []
+    for i in range(PAGE_SIZE):
+        user = User(
+            username=f'user{i}',
+            password='x' * 60,
+            salt=b's' * 29,
+            email=f'user{i}@example.com',
+            phone='13800138000',
+        )
+        user.id = i + 1
+        user.last_login_time = None
+        users.append(user)
+    return users
+
+
+def _page(users: list[User]) -> dict:
+    return {
+        'items': users,
+        'total': 1000,
+        'page': 1,
+        'size': PAGE_SIZE,
+        'total_pages': 10,
+        'links': {'first': '/users?page=1&size=100', 'self': '/users?page=1&size=100'},
+    }
+
+
+async def _fastapi_render(field: ModelField, response: Any, response_class: type) -> bytes:
+    # 与 FastAPI 处理返回值的流程一致：按返回类型校验并序列化，再由响应类编码
+    content = await serialize_response(field=field, response_content=response)
+    return response_class(content).body
+
+
+def _measure(fn) -> float:
+    best = float('inf')
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / ITERATIONS * 1_000_000
+
+
+def _report(name: str, variants: dict) -> None:
+    outputs = [json.loads(fn()) for fn in variants.values()]
+    assert all(output == outputs[0] for output in outputs)
+    before = None
+    print(f'{name}, µs per response (best of {ROUNDS} x {ITERATIONS})')
+    for label, fn in variants.items():
+        elapsed = _measure(fn)
+        before = before or elapsed
+        print(f'  {label:<42} {elapsed:9.2f}  ({before / elapsed:.1f}x)')
+
+
+def main() -> None:
+    loop = asyncio.new_event_loop()
+    users = _users()
+    page = _page(users)
+    user = users[0]
+    list_schema = ResponseSchemaModel[PageData[GetUserInfo]]
+    detail_schema = ResponseSchemaModel[GetUserInfo]
+
+    def render(schema, response, response_class):
+        # 返回类型字段在注册路由时创建一次
+        field = create_response_field(name='Response', type_=schema, mode='serialization')
+        return lambda: loop.run_until_complete(_fastapi_render(field, response(), response_class))
+
+    _report(
+        f'GET /users ({PAGE_SIZE} rows)',
+        {
+            'before: validated model + JSONResponse': render(
+                list_schema, lambda: ResponseModel(code=res.code, msg=res.msg, data=page), JSONResponse
+            ),
+            'model_construct + MsgSpecJSONResponse': render(
+                list_schema, lambda: response_base.success(data=page), MsgSpecJSONResponse
+            ),
+            'struct_success (msgspec Struct)': lambda: response_base.struct_success(data=page, schema=list_schema).body,
+        },
+    )
+    _report(
+        'GET /users/{username}',
+        {
+            'before: GetUserInfo + validated model': render(
+                detail_schema,
+                lambda: ResponseModel(code=res.code, msg=res.msg, data=GetUserInfo(**select_as_dict(user))),
+                JSONResponse,
+            ),
+            'model_construct + MsgSpecJSONResponse': render(
+                detail_schema, lambda: response_base.success(data=user), MsgSpecJSONResponse
+            ),
+            'struct_success (msgspec Struct)': lambda: response_base.struct_success(
+                data=user, schema=detail_schema
+            ).body,
+        },
+    )
+    loop.close()
+
+
+if __name__ == '__main__':
+    main()
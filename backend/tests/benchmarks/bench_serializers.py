@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import time
+
+from decimal import Decimal
+
+from fastapi.encoders import decimal_encoder
+
+from backend.app.admin.model import User
+from backend.utils.serializers import select_list_serialize
+
+ROWS = 10_000
+ROUNDS = 5
+
+
+def _baseline_serialize(rows: list[User]) -> list[dict]:
+    # 优化前的 select_list_serialize 实现
+    result = []
+    for row in rows:
+        item = {}
+        for column in row.__table__.columns.keys():
+            v = getattr(row, column)
+            if isinstance(v, Decimal):
+                v = decimal_encoder(v)
+            item[column] = v
+        result.append(item)
+    return result
+
+
+def _users() -> list[User]:
+    users = []
+    for i in range(ROWS):
+        user = User(
+            username=f'user{i}',
+            password='x' * 60,
+            salt=b's' * 29,
+            email=f'user{i}@example.com',
+            phone=f'138{i:08d}',
+        )
+        user.id = i + 1
+        users.append(user)
+    return users
+
+
+def _measure(fn, rows: list[User]) -> float:
+    best = float('inf')
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    users = _users()
+    assert select_list_serialize(users) == _baseline_serialize(users)
+    before = _measure(_baseline_serialize, users)
+    after = _measure(select_list_serialize, users)
+    print(f'{ROWS} User rows, ms per select_list_serialize call (best of {ROUNDS})')
+    print(f'before (per-row column walk): {before:8.2f}')
+    print(f'after (cached plan):          {after:8.2f}  ({before / after:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
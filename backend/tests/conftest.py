@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import uuid
+
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+
+import pytest
+
+from fakeredis import FakeAsyncRedis
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+# 测试环境变量，未配置 .env 时使用
+os.environ.setdefault('ENVIRONMENT', 'dev')
+os.environ.setdefault('DATABASE_HOST', '127.0.0.1')
+os.environ.setdefault('DATABASE_PORT', '3306')
+os.environ.setdefault('DATABASE_USER', 'root')
+os.environ.setdefault('DATABASE_PASSWORD', '123456')
+os.environ.setdefault('REDIS_HOST', '127.0.0.1')
+os.environ.setdefault('REDIS_PORT', '6379')
+os.environ.setdefault('REDIS_PASSWORD', '')
+os.environ.setdefault('REDIS_DATABASE', '0')
+os.environ.setdefault('TOKEN_SECRET_KEY', '1VkVF75nsNABBjK_7-qz7GtzNy3AMvktc9TCPwKczCk')
+
+T = TypeVar('T')
+
+
+@pytest.fixture
+def run() -> Iterator[Callable[[Awaitable[T]], T]]:
+    """在测试独占的事件循环中执行协程，同一测试内的多次调用共享该事件循环"""
+    loop = asyncio.new_event_loop()
+    try:
+        yield loop.run_until_complete
+    finally:
+        loop.close()
+
+
+@pytest.fixture
+def sqlite_engine(run) -> Iterator[AsyncEngine]:
+    """内存 sqlite 引擎，所有连接共享同一数据库，测试结束时释放"""
+    engine = create_async_engine('sqlite+aiosqlite://', poolclass=StaticPool)
+    try:
+        yield engine
+    finally:
+        run(engine.dispose())
+
+
+@pytest.fixture
+def sqlite_session_maker(sqlite_engine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(bind=sqlite_engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture
+def create_users(run, sqlite_engine) -> Callable[..., None]:
+    """
+    创建用户表并写入用户，参数为用户名或覆盖默认值的字段字典
+
+    E.g. ::
+
+        create_users('alice', {'username': 'bob', 'phone': '13800138000'})
+    """
+
+    def create(*users: str | dict[str, Any]) -> None:
+        run(_create_users(sqlite_engine, users))
+
+    return create
+
+
+@pytest.fixture
+def fake_redis(run) -> Iterator[FakeAsyncRedis]:
+    redis = FakeAsyncRedis(decode_responses=True)
+    try:
+        yield redis
+    finally:
+        run(redis.aclose())
+
+
+def _user_row(user: str | dict[str, Any]) -> dict[str, Any]:
+    fields = {'username': user} if isinstance(user, str) else user
+    username = fields['username']
+    return {
+        'uuid': str(uuid.uuid4()),
+        'password': 'password',
+        'email': f'{username}@example.com',
+        'status': 1,
+        'is_superuser': False,
+        'join_time': datetime(2024, 1, 1),
+        **fields,
+    }
+
+
+async def _create_users(engine: AsyncEngine, users: tuple[str | dict[str, Any], ...]) -> None:
+    from backend.app.admin.model import User
+
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create, checkfirst=True)
+        if users:
+            await conn.execute(insert(User), [_user_row(user) for user in users])
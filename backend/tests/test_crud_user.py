@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import pytest
+
+from sqlalchemy.dialects import mysql, sqlite
+
+from backend.app.admin.crud.crud_user import user_dao
+from backend.app.admin.model import User
+from backend.core.conf import settings
+
+
+def _compile(keyword: str) -> str:
+    clause = user_dao.search_clause(User.username, keyword)
+    return str(clause.compile(dialect=mysql.dialect(), compile_kwargs={'literal_binds': True}))
+
+
+def test_prefix_keyword_uses_btree_prefix_like():
+    assert _compile('bob*') == "sys_user.username LIKE concat('bob', '%%') ESCAPE '/'"
+
+
+def test_ngram_keyword_uses_fulltext_phrase():
+    assert _compile('bob') == 'MATCH (sys_user.username) AGAINST (\'"bob"\' IN BOOLEAN MODE)'
+
+
+@pytest.mark.parametrize(
+    'keyword',
+    [
+        'b',  # 短于 ngram 分词长度
+        'bo b',  # 包含空白
+        'b"ob',  # 包含双引号
+    ],
+)
+def test_keyword_falls_back_to_like(keyword):
+    assert ' LIKE concat(' in _compile(keyword)
+    assert 'MATCH' not in _compile(keyword)
+
+
+@pytest.mark.parametrize(
+    'keyword',
+    [
+        'kin',  # 包含停用词 in
+        'AT',  # 停用词不区分大小写
+    ],
+)
+def test_stopword_keyword_falls_back_to_like(monkeypatch, keyword):
+    monkeypatch.setattr(settings, 'USER_SEARCH_NGRAM_STOPWORDS', {'at', 'in'})
+    assert 'MATCH' not in _compile(keyword)
+    monkeypatch.setattr(settings, 'USER_SEARCH_NGRAM_STOPWORDS', set())
+    assert 'MATCH' in _compile(keyword)
+
+
+def test_ngram_keyword_falls_back_to_like_on_other_dialects(run, sqlite_session_maker, create_users):
+    assert 'MATCH' not in str(user_dao.search_clause(User.username, 'bob').compile(dialect=sqlite.dialect()))
+    create_users('bobby', 'alice', 'alicia')
+
+    async def search(keyword: str) -> list[str]:
+        async with sqlite_session_maker() as db:
+            stmt = await user_dao.get_list(username=keyword, columns=['username'])
+            return sorted((await db.execute(stmt)).scalars().all())
+
+    # 编译缓存按方言复用时，不同关键词的参数仍需正确绑定
+    assert run(search('bob')) == ['bobby']
+    assert run(search('lic')) == ['alice', 'alicia']
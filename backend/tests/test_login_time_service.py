@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+from datetime import datetime
+
+from backend.app.admin.service.login_time_service import LoginTimeService
+from backend.core.conf import settings
+
+
+def test_full_batch_is_flushed_without_waiting_for_interval(monkeypatch, run):
+    monkeypatch.setattr(settings, 'USER_LOGIN_TIME_FLUSH_INTERVAL_SECONDS', 60)
+    monkeypatch.setattr(settings, 'USER_LOGIN_TIME_FLUSH_BATCH_SIZE', 2)
+    service = LoginTimeService()
+    flushed = []
+
+    async def flush():
+        flushed.append(dict(service._buffer))
+        service._buffer, service._first_buffered_at = {}, None
+
+    monkeypatch.setattr(service, 'flush', flush)
+
+    async def main():
+        service.start()
+        service.record(1, datetime.now())
+        service.record(2, datetime.now())
+        await asyncio.sleep(0.1)
+        service._task.cancel()
+
+    run(main())
+    assert len(flushed) == 1
+    assert set(flushed[0]) == {1, 2}
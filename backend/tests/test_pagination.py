@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+import pytest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from backend.common.enums import CountStrategy
+from backend.common import pagination
+from backend.common.exception import errors
+from backend.common.pagination import (
+    DependsCursorPagination,
+    _deferred_join,
+    cursor_paging_data,
+    pagination_depends,
+    paging_data,
+)
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Item(Base):
+    __tablename__ = 'item'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    join_time: Mapped[datetime]
+
+
+@pytest.fixture
+def create_items(run, sqlite_engine):
+    def create(count: int, join_time=lambda i: datetime(2024, 1, 1, 0, 0, i % 60)) -> None:
+        async def main():
+            async with sqlite_engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+                await conn.execute(insert(Item), [{'id': i, 'join_time': join_time(i)} for i in range(1, count + 1)])
+
+        run(main())
+
+    return create
+
+
+def test_estimated_count_falls_back_to_exact_on_sqlite(sqlite_session_maker, create_items):
+    create_items(25)
+    app = FastAPI()
+
+    @app.get('/items', dependencies=[pagination_depends(count=CountStrategy.estimated)])
+    async def items():
+        async with sqlite_session_maker() as db:
+            page = await paging_data(db, select(Item).order_by(Item.id))
+        return {'total': page['total'], 'total_pages': page['total_pages'], 'count': len(page['items'])}
+
+    with TestClient(app) as client:
+        page = client.get('/items', params={'page': 1, 'size': 10}).json()
+    assert page == {'total': 25, 'total_pages': 3, 'count': 10}
+
+
+def test_deferred_join_matches_offset_query(run, sqlite_session_maker, create_items):
+    create_items(50)
+    stmt = select(Item).order_by(Item.id.desc())
+
+    async def main():
+        async with sqlite_session_maker() as db:
+            expected = (await db.execute(stmt.limit(5).offset(30))).scalars().all()
+            rows = (await db.execute(_deferred_join(stmt, 5, 30))).scalars().all()
+        return [row.id for row in expected], [row.id for row in rows]
+
+    expected, ids = run(main())
+    assert ids == expected == [20, 19, 18, 17, 16]
+
+
+@pytest.fixture
+def cursor_client(sqlite_session_maker):
+    app = FastAPI()
+
+    @app.get('/items', dependencies=[DependsCursorPagination])
+    async def items():
+        async with sqlite_session_maker() as db:
+            page = await cursor_paging_data(db, select(Item), keys=(Item.join_time, Item.id))
+        return {'ids': [item.id for item in page['items']], 'links': page['links']}
+
+    with TestClient(app) as client:
+        yield client
+
+
+def test_cursor_pages_tie_break_on_id_without_duplicates_or_gaps(cursor_client, create_items):
+    # 每 3 条数据的 join_time 相同，分页边界落在相同 join_time 内部
+    create_items(10, join_time=lambda i: datetime(2024, 1, 1, 0, 0, i // 3))
+    expected = sorted(range(1, 11), key=lambda i: (i // 3, i), reverse=True)
+    pages = []
+    cursor = None
+    while True:
+        page = cursor_client.get('/items', params={'size': 4, **({'cursor': cursor} if cursor else {})}).json()
+        pages.append(page)
+        cursor = page['links']['next_cursor']
+        if cursor is None:
+            break
+    assert [page['ids'] for page in pages] == [expected[:4], expected[4:8], expected[8:]]
+
+    # 从末页向前翻页得到与前一页相同的数据
+    prev = cursor_client.get('/items', params={'size': 4, 'cursor': pages[-1]['links']['prev_cursor']}).json()
+    assert prev['ids'] == expected[4:8]
+    assert prev['links']['next_cursor'] is not None
+
+
+def test_first_cursor_page_has_no_prev_link(cursor_client, create_items):
+    create_items(3)
+    page = cursor_client.get('/items', params={'size': 5}).json()
+    assert page['ids'] == [3, 2, 1]
+    assert page['links']['next_cursor'] is None
+    assert page['links']['prev_cursor'] is None
+
+
+@pytest.mark.parametrize('cursor', ['not-base64!', 'WyJ4IiwgMV0', 'WyJuIiwgMV0'])
+def test_invalid_cursor_is_rejected(cursor_client, create_items, cursor):
+    create_items(3)
+    with pytest.raises(errors.RequestError):
+        cursor_client.get('/items', params={'cursor': cursor})
+
+
+def test_stale_cached_count_keeps_next_page_reachable(
+    monkeypatch, run, sqlite_engine, sqlite_session_maker, fake_redis
+):
+    monkeypatch.setattr(pagination, 'redis_client', fake_redis)
+    app = FastAPI()
+
+    @app.get('/items', dependencies=[pagination_depends(count=CountStrategy.cached)])
+    async def items():
+        async with sqlite_session_maker() as db:
+            page = await paging_data(db, select(Item).order_by(Item.id))
+        return {'total': page['total'], 'next': page['links']['next'], 'count': len(page['items'])}
+
+    async def insert_items(start: int, stop: int) -> None:
+        async with sqlite_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(insert(Item), [{'id': i, 'join_time': datetime(2024, 1, 1)} for i in range(start, stop)])
+
+    with TestClient(app) as client:
+        run(insert_items(1, 26))
+        assert client.get('/items', params={'page': 1, 'size': 10}).json()['total'] == 25
+        # 缓存的总数已过期，第 3 页为满页时仍需可访问下一页
+        run(insert_items(26, 46))
+        page = client.get('/items', params={'page': 3, 'size': 10}).json()
+        assert page['count'] == 10
+        assert page['total'] == 31
+        assert page['next'] is not None
+        last = client.get('/items', params={'page': 5, 'size': 10}).json()
+    assert last == {'total': 45, 'next': None, 'count': 5}
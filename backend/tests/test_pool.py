@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import pytest
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.database.pool import InstrumentedAsyncQueuePool, enable_idle_ping, instrument_pool, pool_stats
+
+
+@pytest.fixture
+def idle_ping_engine(run):
+    engines = []
+
+    def create(idle_seconds: float):
+        engine = create_async_engine('sqlite+aiosqlite://', poolclass=InstrumentedAsyncQueuePool, pool_size=1)
+        instrument_pool(engine)
+        enable_idle_ping(engine, idle_seconds)
+        engines.append(engine)
+        return engine
+
+    yield create
+    for engine in engines:
+        run(engine.dispose())
+
+
+async def _select_one(engine) -> int:
+    async with engine.connect() as conn:
+        return (await conn.execute(text('SELECT 1'))).scalar_one()
+
+
+def test_idle_ping_skips_recently_used_connections(run, idle_ping_engine):
+    engine = idle_ping_engine(idle_seconds=60)
+    for _ in range(3):
+        run(_select_one(engine))
+    stats = pool_stats(engine)
+    assert stats['checkouts'] == 3
+    assert stats['pings'] == 0
+
+
+def test_idle_ping_replaces_dead_connection_transparently(run, idle_ping_engine):
+    engine = idle_ping_engine(idle_seconds=0)
+    run(_select_one(engine))
+    dialect = engine.sync_engine.dialect
+    ping = dialect.do_ping
+
+    def dead_ping(dbapi_connection):
+        # 仅首个连接失效，重新建立的连接探活成功
+        dialect.do_ping = ping
+        raise ConnectionError('gone')
+
+    dialect.do_ping = dead_ping
+    assert run(_select_one(engine)) == 1
+    stats = pool_stats(engine)
+    assert stats['ping_failures'] == 1
+    assert stats['invalidated'] == 1
+    assert stats['connects'] == 2
+
+
+def test_unreachable_replica_does_not_abort_warmup(monkeypatch, run, sqlite_engine, sqlite_session_maker, create_users):
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    from backend.core import registrar
+    from backend.database.replica import Replica, ReplicaSet
+
+    create_users()
+    broken = create_async_engine('sqlite+aiosqlite:////nonexistent/replica.db')
+    replica = Replica('replica_0', broken, async_sessionmaker(bind=broken))
+    monkeypatch.setattr(registrar, 'async_engine', sqlite_engine)
+    monkeypatch.setattr(registrar, 'async_db_session', sqlite_session_maker)
+    monkeypatch.setattr(registrar, 'replica_set', ReplicaSet([replica]))
+    warmed = []
+    warmup = registrar.user_dao.warmup
+
+    async def record_warmup(db) -> None:
+        await warmup(db)
+        warmed.append(db.get_bind())
+
+    monkeypatch.setattr(registrar.user_dao, 'warmup', record_warmup)
+    try:
+        run(registrar.register_db_warmup())
+    finally:
+        run(broken.dispose())
+    assert not replica.healthy
+    assert warmed == [sqlite_engine.sync_engine]
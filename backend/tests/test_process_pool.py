@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from backend.common.exception import errors
+from backend.utils.process_pool import BoundedProcessPool
+
+
+def _crash() -> None:
+    os._exit(1)
+
+
+def test_worker_crash_maps_to_503_and_recovers(run):
+    pool = BoundedProcessPool(max_workers=1, max_queue=1, timeout=10)
+
+    async def main():
+        with pytest.raises(errors.ServiceUnavailableError):
+            await pool.run(_crash)
+        return await pool.run(abs, -1)
+
+    try:
+        assert run(main()) == 1
+        assert pool.stats()['broken'] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_full_queue_is_rejected(run):
+    pool = BoundedProcessPool(max_workers=1, max_queue=0, timeout=10)
+    pool._pending = 1
+    with pytest.raises(errors.ServiceUnavailableError):
+        run(pool.run(abs, -1))
+    assert pool.rejected == 1
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import pytest
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from backend.database.query_stats import QueryStats, instrument_queries, normalize_sql, query_stats_ctx
+
+
+def test_normalize_sql_strips_literals():
+    assert normalize_sql("SELECT * FROM t WHERE a = 1 AND b = 'x'  AND c IN (?, ?)") == (
+        'SELECT * FROM t WHERE a = ? AND b = ? AND c IN (...)'
+    )
+
+
+def test_failed_statement_does_not_leak_start_time(run, sqlite_engine):
+    instrument_queries(sqlite_engine)
+    stats = QueryStats()
+
+    async def main():
+        async with sqlite_engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    await conn.execute(text('SELECT * FROM missing_table'))
+            await conn.execute(text('SELECT 1'))
+            return dict(conn.sync_connection.info)
+
+    token = query_stats_ctx.set(stats)
+    try:
+        info = run(main())
+    finally:
+        query_stats_ctx.reset(token)
+    assert stats.count == 1
+    assert stats.slowest_statement == 'SELECT ?'
+    assert info == {}
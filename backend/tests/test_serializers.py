@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from decimal import Decimal
+
+from sqlalchemy import Numeric
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from backend.utils.serializers import select_as_dict, select_columns_serialize, select_list_serialize
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Order(Base):
+    __tablename__ = 'order'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    price: Mapped[Decimal | None] = mapped_column(Numeric(10, 2))
+    amount: Mapped[Decimal] = mapped_column(Numeric(10, 0))
+
+
+def test_columns_serialize_converts_decimal_columns():
+    order = Order(id=1, price=Decimal('9.90'), amount=Decimal('3'))
+    assert select_columns_serialize(order) == {'id': 1, 'price': 9.9, 'amount': 3}
+    assert select_list_serialize([order, Order(id=2, price=None, amount=Decimal('1'))])[1] == {
+        'id': 2,
+        'price': None,
+        'amount': 1,
+    }
+
+
+def test_select_as_dict_does_not_mutate_row():
+    order = Order(id=1, price=Decimal('9.90'), amount=Decimal('3'))
+    assert '_sa_instance_state' not in select_as_dict(order)
+    assert '_sa_instance_state' in order.__dict__
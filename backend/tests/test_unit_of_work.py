@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+from sqlalchemy import func, insert, select
+
+from backend.database import db
+
+
+def test_after_commit_failure_keeps_commit(monkeypatch, run, sqlite_session_maker, create_users):
+    from backend.app.admin.model import User
+
+    create_users()
+    monkeypatch.setattr(db, 'async_db_session', sqlite_session_maker)
+    called = []
+
+    async def fail() -> None:
+        raise RuntimeError('hook failed')
+
+    async def record(name: str) -> None:
+        called.append(name)
+
+    async def main():
+        async with db.unit_of_work() as uow:
+            await uow.session.execute(
+                insert(User).values(
+                    uuid='u',
+                    username='alice',
+                    password='p',
+                    email='alice@example.com',
+                    status=1,
+                    join_time=datetime(2024, 1, 1),
+                )
+            )
+            uow.after_commit(fail)
+            uow.after_commit(record, 'alice')
+        async with sqlite_session_maker() as session:
+            return await session.scalar(select(func.count()).select_from(User))
+
+    assert run(main()) == 1
+    assert called == ['alice']
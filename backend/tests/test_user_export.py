@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import csv
+import io
+import json
+
+from datetime import datetime
+
+import pytest
+
+from backend.app.admin.crud.crud_user import user_dao
+from backend.app.admin.schema.user import GetUserInfo
+from backend.app.admin.service.user_service import _stream_export
+from backend.common.enums import ExportFormat
+
+USER = {
+    'uuid': '0d6f5ad3-9f9c-4a6c-9d36-7e3b2c0c9a01',
+    'username': 'test',
+    'password': 'password',
+    'email': 'test@example.com',
+    'status': 1,
+    'is_superuser': False,
+    'phone': '13800138000',
+    'join_time': datetime(2024, 1, 2, 3, 4, 5),
+}
+
+
+@pytest.fixture
+def export(run, sqlite_session_maker, create_users):
+    create_users(USER)
+    columns = list(GetUserInfo.model_fields)
+
+    async def main(fmt: ExportFormat) -> bytes:
+        stmt = await user_dao.get_list(columns=columns)
+        return b''.join([chunk async for chunk in _stream_export(sqlite_session_maker, stmt, columns, fmt)])
+
+    return lambda fmt: run(main(fmt))
+
+
+def test_ndjson_export_matches_user_info_schema(export):
+    (line,) = export(ExportFormat.ndjson).splitlines()
+    row = json.loads(line)
+    assert row['phone'] == 'tel:+86-138-0013-8000'
+    assert row['join_time'] == '2024-01-02 03:04:05'
+    assert row == json.loads(GetUserInfo.model_validate({**USER, 'id': 1}).model_dump_json())
+
+
+def test_csv_export_matches_user_info_schema(export):
+    header, row = csv.reader(io.StringIO(export(ExportFormat.csv).decode('utf-8-sig')))
+    assert header == list(GetUserInfo.model_fields)
+    row = dict(zip(header, row))
+    assert row['phone'] == 'tel:+86-138-0013-8000'
+    assert row['join_time'] == '2024-01-02 03:04:05'
+    assert row['last_login_time'] == ''
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import pytest
+
+from backend.app.admin.service.user_service import UserService
+from backend.common.exception import errors
+
+
+def test_fields_are_returned_in_schema_order():
+    assert UserService.get_fields(' email , username') == ('username', 'email')
+    assert UserService.get_fields(None) == UserService.get_fields('')
+
+
+@pytest.mark.parametrize('fields', [',', ' ', ' , ,'])
+def test_empty_field_selection_is_rejected(fields):
+    with pytest.raises(errors.RequestError):
+        UserService.get_fields(fields)
+
+
+def test_unknown_field_is_rejected():
+    with pytest.raises(errors.RequestError):
+        UserService.get_fields('username,password')
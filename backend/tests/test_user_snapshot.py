@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from backend.app.admin.schema.user import CurrentUserIns
+from backend.common.security.user_snapshot import UserSnapshotCache
+
+
+def _user(status: int = 1) -> CurrentUserIns:
+    return CurrentUserIns(id=1, username='test', status=status, is_superuser=False)
+
+
+def test_unsynced_cache_is_bypassed():
+    cache = UserSnapshotCache()
+    cache.set(1, _user(), cache.version)
+    assert cache.get(1) is None
+
+
+def test_invalidation_message_evicts_snapshot():
+    cache = UserSnapshotCache()
+    cache._synced = True
+    cache.set(1, _user(), cache.version)
+    assert cache.get(1) is not None
+    cache._evict(1)
+    assert cache.get(1) is None
+
+
+def test_snapshot_loaded_before_invalidation_is_not_cached():
+    cache = UserSnapshotCache()
+    cache._synced = True
+    version = cache.version
+    cache._evict(1)
+    cache.set(1, _user(status=1), version)
+    assert cache.get(1) is None
+
+
+def test_snapshot_miss_loads_from_primary(monkeypatch, run, sqlite_session_maker, create_users, fake_redis):
+    from backend.common.security import jwt
+
+    create_users({'username': 'test', 'status': 0})
+    monkeypatch.setattr(jwt, 'async_db_session', sqlite_session_maker)
+    monkeypatch.setattr(jwt, 'redis_client', fake_redis)
+
+    user = run(jwt.get_user_snapshot(1))
+    assert user.status == 0
+    cached = run(fake_redis.get(f'{jwt.settings.USER_CACHE_REDIS_PREFIX}:1'))
+    assert CurrentUserIns.model_validate_json(cached).status == 0
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from backend.app.admin.crud.crud_user import user_dao
+from backend.app.admin.service import user_suggest_service as module
+from backend.core.conf import settings
+
+
+def test_changes_during_rebuild_survive_rename(monkeypatch, run, fake_redis, sqlite_session_maker, create_users):
+    create_users('alice', 'bob')
+    monkeypatch.setattr(module, 'redis_client', fake_redis)
+    monkeypatch.setattr(module, 'async_db_session', sqlite_session_maker)
+    service = module.UserSuggestService()
+    stream_usernames = user_dao.stream_usernames
+
+    async def stream_then_change(db):
+        result = await stream_usernames(db)
+        # 读取数据库之后提交的变更
+        await service.remove('bob')
+        await service.add('Carol')
+        return result
+
+    monkeypatch.setattr(user_dao, 'stream_usernames', stream_then_change)
+    count = run(service.rebuild())
+    assert count == 2
+    assert run(service.suggest('', 10)) == ['alice', 'Carol']
+
+    async def leftovers():
+        return [key async for key in fake_redis.scan_iter() if key != settings.USER_SUGGEST_REDIS_KEY]
+
+    assert run(leftovers()) == []
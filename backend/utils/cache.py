@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import time
+
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, TypeVar
+
+KT = TypeVar('KT', bound=Hashable)
+VT = TypeVar('VT')
+
+_MISSING = object()
+
+
+class LRUCache(Generic[KT, VT]):
+    """
+    进程内 LRU 缓存，支持条目过期时间，非线程安全，仅适用于单个事件循环内使用
+
+    E.g. ::
+
+        cache = LRUCache(maxsize=1024, ttl=10)
+        cache.set('key', 'value')
+        cache.get('key')
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        """
+        :param maxsize: 最大条目数
+        :param ttl: 默认过期时间，单位：秒，None 表示不过期
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[KT, tuple[float | None, VT]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: KT) -> bool:
+        return self._lookup(key) is not _MISSING
+
+    def _lookup(self, key: KT) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return _MISSING
+        expire_at, value = item
+        if expire_at is not None and expire_at <= time.monotonic():
+            del self._data[key]
+            return _MISSING
+        return value
+
+    def get(self, key: KT, default: VT | None = None) -> VT | None:
+        """
+        获取缓存
+
+        :param key:
+        :param default:
+        :return:
+        """
+        value = self._lookup(key)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: KT, value: VT, ttl: float | None = None) -> None:
+        """
+        设置缓存
+
+        :param key:
+        :param value:
+        :param ttl: 过期时间，单位：秒，默认使用实例过期时间
+        :return:
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if self.maxsize <= 0 or (ttl is not None and ttl <= 0):
+            return
+        expire_at = time.monotonic() + ttl if ttl is not None else None
+        self._data[key] = (expire_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: KT) -> None:
+        """
+        删除缓存
+
+        :param key:
+        :return:
+        """
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        清空缓存
+
+        :return:
+        """
+        self._data.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return round(self.hits / total, 4) if total else 0.0
+
+    def stats(self) -> dict:
+        """
+        缓存统计信息
+
+        :return:
+        """
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+        }
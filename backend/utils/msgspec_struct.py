@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import datetime
+import decimal
+import enum
+import types
+import uuid
+
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Annotated, Any, Callable, Union, get_args, get_origin
+
+import msgspec
+
+from pydantic import BaseModel, EmailStr, TypeAdapter
+from pydantic_core import PydanticUndefined
+
+# msgspec 原生支持且序列化结果与 pydantic 一致的类型
+_NATIVE_TYPES = (
+    str,
+    int,
+    float,
+    bool,
+    bytes,
+    datetime.datetime,
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+    uuid.UUID,
+    decimal.Decimal,
+    type(None),
+)
+
+
+class _Converted:
+    """
+    需要转换的字段值，转换时调用 convert 得到序列化结果，序列化时直接输出
+    """
+
+    __slots__ = ('value',)
+
+    convert: Callable[[Any], Any]
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+@lru_cache(maxsize=None)
+def _converted_type(annotation: type, convert: Callable[[Any], Any]) -> type[_Converted]:
+    return type(f'{annotation.__name__}Converted', (_Converted,), {'convert': staticmethod(convert)})
+
+
+@lru_cache(maxsize=None)
+def _pydantic_converter(annotation: type) -> Callable[[Any], Any]:
+    adapter = TypeAdapter(annotation)
+    return lambda v: adapter.dump_python(adapter.validate_python(v), mode='json')
+
+
+def _struct_type(annotation: Any, encoders: dict[type, Callable[[Any], Any]]) -> Any:
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+    if annotation is Any:
+        return Any
+    if origin is Annotated:
+        return _struct_type(args[0], encoders)
+    if origin in (Union, types.UnionType):
+        return Union[tuple(_struct_type(arg, encoders) for arg in args)]  # noqa: UP007
+    if origin in (list, set, frozenset, tuple, Sequence):
+        return list[_struct_type(args[0], encoders)] if args else list
+    if origin is dict:
+        return dict[_struct_type(args[0], encoders), _struct_type(args[1], encoders)] if args else dict
+    if not isinstance(annotation, type):
+        return Any
+    if annotation in (list, set, frozenset, tuple):
+        return list
+    if annotation is dict:
+        return dict
+    if issubclass(annotation, BaseModel):
+        return pydantic_to_struct(annotation)
+    for encode_type, encoder in encoders.items():
+        if issubclass(annotation, encode_type):
+            return _converted_type(annotation, encoder)
+    if annotation is EmailStr:
+        return str
+    if annotation in _NATIVE_TYPES or issubclass(annotation, enum.Enum):
+        return annotation
+    # 其余类型（例如手机号、URL）通过 pydantic 校验并序列化，保证输出一致
+    return _converted_type(annotation, _pydantic_converter(annotation))
+
+
+@lru_cache(maxsize=None)
+def pydantic_to_struct(model: type[BaseModel]) -> type[msgspec.Struct]:
+    """
+    根据 pydantic 模型生成等价的 msgspec Struct，嵌套模型及泛型参数化模型将一并生成，不支持字段别名
+
+    datetime 等字段按模型配置的 json_encoders 输出，msgspec 无法原生处理的类型通过 pydantic 校验并序列化
+
+    :param model:
+    :return:
+    """
+    encoders = model.model_config.get('json_encoders') or {}
+    fields = []
+    for name, field in model.model_fields.items():
+        struct_type = _struct_type(field.annotation, encoders)
+        if field.is_required():
+            fields.append((name, struct_type))
+        elif field.default_factory is not None:
+            fields.append((name, struct_type, msgspec.field(default_factory=field.default_factory)))
+        else:
+            default = None if field.default is PydanticUndefined else field.default
+            fields.append((name, struct_type, default))
+    return msgspec.defstruct(model.__name__, fields, kw_only=True)
+
+
+def _dec_hook(type_: type, obj: Any) -> Any:
+    if isinstance(type_, type) and issubclass(type_, _Converted):
+        return type_(type_.convert(obj))
+    raise NotImplementedError
+
+
+def _enc_hook(obj: Any) -> Any:
+    if isinstance(obj, _Converted):
+        return obj.value
+    raise NotImplementedError
+
+
+_encoder = msgspec.json.Encoder(enc_hook=_enc_hook)
+
+
+def struct_encode(model: type[BaseModel], data: Any) -> bytes:
+    """
+    按 pydantic 模型对应的 msgspec Struct 校验数据并序列化为 json，支持 ORM 对象等属性访问数据
+
+    :param model:
+    :param data:
+    :return:
+    """
+    struct = msgspec.convert(data, pydantic_to_struct(model), from_attributes=True, dec_hook=_dec_hook)
+    return _encoder.encode(struct)
+
+
+def struct_encode_lines(model: type[BaseModel], data: Sequence[Any]) -> bytes:
+    """
+    按 pydantic 模型对应的 msgspec Struct 批量校验数据并序列化为换行分隔的 json
+
+    :param model:
+    :param data:
+    :return:
+    """
+    structs = msgspec.convert(data, list[pydantic_to_struct(model)], from_attributes=True, dec_hook=_dec_hook)
+    return _encoder.encode_lines(structs)
+
+
+def struct_to_builtins(model: type[BaseModel], data: Sequence[Any]) -> list[dict[str, Any]]:
+    """
+    按 pydantic 模型对应的 msgspec Struct 批量校验数据并转换为与 json 序列化结果一致的字典
+
+    :param model:
+    :param data:
+    :return:
+    """
+    structs = msgspec.convert(data, list[pydantic_to_struct(model)], from_attributes=True, dec_hook=_dec_hook)
+    return msgspec.to_builtins(structs, enc_hook=_enc_hook)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import suppress
+from typing import Any, Callable, TypeVar
+
+from backend.common.exception import errors
+
+T = TypeVar('T')
+
+
+class BoundedProcessPool:
+    """
+    有界进程池，用于在事件循环之外执行 CPU 密集型任务
+
+    排队任务数超过上限、等待超时或子进程异常退出时，直接抛出 503 异常，避免请求堆积；进程池在首次使用时创建，
+    以兼容多进程部署的 fork 模式
+
+    每个 web 工作进程各自创建进程池，实际子进程总数为 web 工作进程数 × max_workers
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, timeout: float):
+        """
+        :param max_workers: 工作进程数
+        :param max_queue: 最大排队任务数
+        :param timeout: 等待超时时间，单位：秒
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.rejected = 0
+        self.timeouts = 0
+        self.broken = 0
+        self._pending = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _release(self) -> None:
+        self._pending -= 1
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        在进程池中执行任务
+
+        :param fn: 可被 pickle 的模块级函数
+        :param args:
+        :return:
+        """
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise errors.ServiceUnavailableError(msg='服务繁忙，请稍后重试')
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._reset(executor)
+            executor = self.executor
+            future = executor.submit(fn, *args)
+        self._pending += 1
+
+        def _done(_: Future) -> None:
+            with suppress(RuntimeError):
+                loop.call_soon_threadsafe(self._release)
+
+        future.add_done_callback(_done)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise errors.ServiceUnavailableError(msg='服务繁忙，请稍后重试')
+        except BrokenProcessPool:
+            # 子进程在执行任务期间异常退出，重建进程池供后续任务使用
+            self.broken += 1
+            self._reset(executor)
+            raise errors.ServiceUnavailableError(msg='服务繁忙，请稍后重试')
+
+    def _reset(self, executor: ProcessPoolExecutor) -> None:
+        if self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        """
+        关闭进程池
+
+        :return:
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        """
+        进程池统计信息
+
+        :return:
+        """
+        return {
+            'workers': self.max_workers,
+            'in_flight': min(self._pending, self.max_workers),
+            'queue_depth': max(self._pending - self.max_workers, 0),
+            'max_queue': self.max_queue,
+            'rejected': self.rejected,
+            'timeouts': self.timeouts,
+            'broken': self.broken,
+        }
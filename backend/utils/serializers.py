@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 from decimal import Decimal
+from functools import lru_cache
+from operator import attrgetter
 from typing import Any, Sequence, TypeVar
 
 from fastapi.encoders import decimal_encoder
@@ -14,6 +16,50 @@ RowData = Row | RowMapping | Any
 R = TypeVar('R', bound=RowData)
 
 
+class SerializerPlan:
+    """
+    Serializer plan of a mapped class, the column getters and the columns that may hold Decimal values
+    are resolved once, rows are read with a single attrgetter call
+    """
+
+    def __init__(self, model: type):
+        mapper = class_mapper(model)
+        keys = []
+        decimal_indexes = []
+        for index, column in enumerate(mapper.local_table.columns):
+            keys.append(mapper.get_property_by_column(column).key)
+            try:
+                python_type = column.type.python_type
+            except NotImplementedError:
+                python_type = None
+            if python_type is None or python_type is Decimal:
+                decimal_indexes.append(index)
+        self.keys: tuple[str, ...] = tuple(keys)
+        self._getter = attrgetter(*keys) if len(keys) > 1 else (lambda row: (getattr(row, keys[0]),))
+        self._decimal_indexes = tuple(decimal_indexes)
+
+    def to_dict(self, row: Any) -> dict:
+        values = self._getter(row)
+        if self._decimal_indexes:
+            values = list(values)
+            for index in self._decimal_indexes:
+                v = values[index]
+                if isinstance(v, Decimal):
+                    values[index] = decimal_encoder(v)
+        return dict(zip(self.keys, values))
+
+
+@lru_cache(maxsize=None)
+def get_serializer_plan(model: type) -> SerializerPlan:
+    """
+    Get the cached serializer plan of a mapped class
+
+    :param model:
+    :return:
+    """
+    return SerializerPlan(model)
+
+
 def select_columns_serialize(row: R) -> dict:
     """
     Serialize SQLAlchemy select table columns, does not contain relational columns
@@ -21,13 +67,7 @@ def select_columns_serialize(row: R) -> dict:
     :param row:
     :return:
     """
-    result = {}
-    for column in row.__table__.columns.keys():
-        v = getattr(row, column)
-        if isinstance(v, Decimal):
-            v = decimal_encoder(v)
-        result[column] = v
-    return result
+    return get_serializer_plan(type(row)).to_dict(row)
 
 
 def select_list_serialize(row: Sequence[R]) -> list:
@@ -37,8 +77,10 @@ def select_list_serialize(row: Sequence[R]) -> list:
     :param row:
     :return:
     """
-    result = [select_columns_serialize(_) for _ in row]
-    return result
+    if not row:
+        return []
+    to_dict = get_serializer_plan(type(row[0])).to_dict
+    return [to_dict(_) for _ in row]
 
 
 def select_as_dict(row: R, use_alias: bool = False) -> dict:
@@ -54,9 +96,7 @@ def select_as_dict(row: R, use_alias: bool = False) -> dict:
     :return:
     """
     if not use_alias:
-        result = row.__dict__
-        if '_sa_instance_state' in result:
-            del result['_sa_instance_state']
+        result = {k: v for k, v in row.__dict__.items() if k != '_sa_instance_state'}
     else:
         result = {}
         mapper = class_mapper(row.__class__)
@@ -1,12 +1,14 @@
 # fmt: off
+import multiprocessing
+
 # 监听内网端口
 bind = '0.0.0.0:8001'
 
 # 工作目录
 chdir = '/fsm/backend/'
 
-# 并行工作进程数
-workers = 1
+# 并行工作进程数，验证码及登录状态均保存在 redis 中，可按 CPU 核数扩展
+workers = multiprocessing.cpu_count()
 
 # 监听队列
 backlog = 512